@@ -3,10 +3,31 @@ Enhanced chat handler for AI review analysis.
 Handles date range parsing, review filtering, and all user intents.
 """
 
+import hashlib
+import logging
 import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from enum import IntFlag
 from typing import Optional, List, Dict, Any, Tuple
 
+import numpy as np
+from pydantic import ValidationError
+
+from fast_stats import sentiment_counts, rating_mean_count
+from schemas import DateRange
+
+logger = logging.getLogger(__name__)
+
+# Optional Aho-Corasick automaton for topic keyword matching
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 # Try to use dateutil, fallback to manual parsing
 try:
     from dateutil import parser as date_parser
@@ -34,6 +55,106 @@ except ImportError:
     date_parser = MockParser()
 
 
+# "2023", "theke", "porjonto" etc. - user wants a long historical range
+HISTORY_RE = re.compile(r"\b20(2[0-9])\b|থেকে|theke|porjonto|পর্যন্ত", re.IGNORECASE)
+
+# Per-call patterns, compiled once (re's internal cache can be evicted by other callers)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+class Intent(IntFlag):
+    """Bitmask of chat intents detected in a question."""
+    NONE = 0
+    SCREENSHOT = 1 << 0
+    EXPORT = 1 << 1
+    STATS = 1 << 2
+    STATS_NEGATIVE = 1 << 3
+    STATS_POSITIVE = 1 << 4
+    STATS_NEUTRAL = 1 << 5
+    STATS_RATING = 1 << 6
+    TOPICS = 1 << 7
+    TOPICS_NEGATIVE = 1 << 8
+    TOPICS_POSITIVE = 1 << 9
+    PRODUCT = 1 << 10
+    RECOMMEND = 1 << 11
+
+
+# Intent keywords (matched as substrings of the lowercased question)
+INTENT_KEYWORDS: Dict[Intent, Tuple[str, ...]] = {
+    Intent.SCREENSHOT: ("screenshot", "ui generate", "report layout", "ki show korbo"),
+    Intent.EXPORT: ("export", "csv", "download", "export kivabe"),
+    Intent.STATS: ("total", "koyta", "how many", "koto"),
+    Intent.STATS_NEGATIVE: ("negative", "neg", "kharap"),
+    Intent.STATS_POSITIVE: ("positive", "pos", "valo", "bhalo"),
+    Intent.STATS_NEUTRAL: ("neutral",),
+    Intent.STATS_RATING: ("rating", "average", "avg"),
+    Intent.TOPICS: ("topic", "issue", "problem", "pain", "complaint", "praise"),
+    Intent.TOPICS_NEGATIVE: ("negative", "issue", "problem", "complaint", "kharap"),
+    Intent.TOPICS_POSITIVE: ("positive", "praise", "good", "valo"),
+    Intent.PRODUCT: ("product", "item", "this product"),
+    Intent.RECOMMEND: ("recommend", "suggest", "improve", "fix", "what should", "ki kora"),
+}
+
+# Keyword -> OR of the intent bits it belongs to
+_KEYWORD_BITS: Dict[str, int] = {}
+for _intent, _keywords in INTENT_KEYWORDS.items():
+    for _kw in _keywords:
+        _KEYWORD_BITS[_kw] = _KEYWORD_BITS.get(_kw, 0) | int(_intent)
+
+# One precompiled alternation per intent (fallback when pyahocorasick is missing)
+_INTENT_RES: List[Tuple[int, "re.Pattern[str]"]] = [
+    (int(intent), re.compile("|".join(map(re.escape, keywords))))
+    for intent, keywords in INTENT_KEYWORDS.items()
+]
+
+# Single automaton over every intent keyword, value = intent bits
+if HAS_AHOCORASICK:
+    _INTENT_AUTOMATON = ahocorasick.Automaton()
+    for _kw, _bits in _KEYWORD_BITS.items():
+        _INTENT_AUTOMATON.add_word(_kw, _bits)
+    _INTENT_AUTOMATON.make_automaton()
+
+
+def detect_intents(ql: str) -> Intent:
+    """
+    Bitmask of all intents whose keywords occur (as substrings) in the lowercased question.
+    One automaton pass over `ql` when pyahocorasick is installed.
+    """
+    mask = 0
+    if HAS_AHOCORASICK:
+        for _, bits in _INTENT_AUTOMATON.iter(ql):
+            mask |= bits
+    else:
+        for bits, pattern in _INTENT_RES:
+            if pattern.search(ql):
+                mask |= bits
+    return Intent(mask)
+
+
+# Bengali/English year ranges:
+# - "from 2023 to 2026"
+# - "2023 theke 2026 porjonto"
+# - "2023 থেকে 2026 পর্যন্ত"
+# - "2023 theke" (end=today)
+# - "2023 theke 2026 jan" (end=Jan end_year)
+_YEAR = r"(\d{4})"
+_SEP = r"(?:to|until|through|till|পর্যন্ত|porjonto|poro?jonto|theke|থেকে|থেকে\s+আজ\s+পর্যন্ত|aj\s+porjonto|-|–|—)"
+_YEAR_RANGE_RE = re.compile(
+    rf"(?:from\s+)?{_YEAR}\s*{_SEP}\s*{_YEAR}(?:\s+(?:first|january|jan|1st|জানুয়ারি|janury)\b.*)?",
+    re.IGNORECASE,
+)
+_JANUARY_RE = re.compile(r"(?:first|january|jan|1st|জানুয়ারি)", re.IGNORECASE)
+_YEAR_FROM_RE = re.compile(rf"{_YEAR}\s*(?:theke|থেকে)\b", re.IGNORECASE)
+
+# Explicit date ranges: "Dec 10 - Jan 9", "2025-12-10 to 2026-01-09", etc.
+_DATE_RANGE_RES = [
+    re.compile(r"(\w+\s+\d+)\s*[-–—]\s*(\w+\s+\d+)", re.IGNORECASE),  # "Dec 10 - Jan 9"
+    re.compile(r"(\d{4}-\d{2}-\d{2})\s*[-–—]\s*(\d{4}-\d{2}-\d{2})", re.IGNORECASE),  # "2025-12-10 - 2026-01-09"
+    re.compile(r"(\d{1,2}/\d{1,2}/\d{4})\s*[-–—]\s*(\d{1,2}/\d{1,2}/\d{4})", re.IGNORECASE),  # "12/10/2025 - 01/09/2026"
+]
+
+
 def parse_date_range(question: str) -> Optional[Dict[str, str]]:
     """
     Parse date range from user question.
@@ -65,23 +186,13 @@ def parse_date_range(question: str) -> Optional[Dict[str, str]]:
         end = last_day_prev_month
         return {"start": start.strftime("%Y-%m-%d"), "end": end.strftime("%Y-%m-%d")}
     
-    # Bengali/English year ranges:
-    # - "from 2023 to 2026"
-    # - "2023 theke 2026 porjonto"
-    # - "2023 থেকে 2026 পর্যন্ত"
-    # - "2023 theke" (end=today)
-    # - "2023 theke 2026 jan" (end=Jan end_year)
-    YEAR = r"(\d{4})"
-    SEP = r"(?:to|until|through|till|পর্যন্ত|porjonto|poro?jonto|theke|থেকে|থেকে\s+আজ\s+পর্যন্ত|aj\s+porjonto|-|–|—)"
-
     # Pattern A: explicit start year + end year
-    year_range_pattern = rf"(?:from\s+)?{YEAR}\s*{SEP}\s*{YEAR}(?:\s+(?:first|january|jan|1st|জানুয়ারি|janury)\b.*)?"
-    m = re.search(year_range_pattern, question, re.IGNORECASE)
+    m = _YEAR_RANGE_RE.search(question)
     if m:
         try:
             start_year = int(m.group(1))
             end_year = int(m.group(2))
-            if re.search(r"(?:first|january|jan|1st|জানুয়ারি)", question, re.IGNORECASE):
+            if _JANUARY_RE.search(question):
                 start_date = datetime(start_year, 1, 1)
                 end_date = datetime(end_year, 1, 31)
             else:
@@ -89,11 +200,10 @@ def parse_date_range(question: str) -> Optional[Dict[str, str]]:
                 end_date = datetime(end_year, 12, 31)
             return {"start": start_date.strftime("%Y-%m-%d"), "end": end_date.strftime("%Y-%m-%d")}
         except Exception as e:
-            print(f"Year range parsing error: {e}")
+            logger.warning("Year range parsing error: %s", e)
 
     # Pattern B: "2023 theke" (end=today)
-    year_from_pattern = rf"{YEAR}\s*(?:theke|থেকে)\b"
-    m2 = re.search(year_from_pattern, question, re.IGNORECASE)
+    m2 = _YEAR_FROM_RE.search(question)
     if m2:
         try:
             start_year = int(m2.group(1))
@@ -101,17 +211,11 @@ def parse_date_range(question: str) -> Optional[Dict[str, str]]:
             end_date = today
             return {"start": start_date.strftime("%Y-%m-%d"), "end": end_date.strftime("%Y-%m-%d")}
         except Exception as e:
-            print(f"Year-from parsing error: {e}")
+            logger.warning("Year-from parsing error: %s", e)
     
     # Explicit date ranges: "Dec 10 - Jan 9", "2025-12-10 to 2026-01-09", etc.
-    date_patterns = [
-        r"(\w+\s+\d+)\s*[-–—]\s*(\w+\s+\d+)",  # "Dec 10 - Jan 9"
-        r"(\d{4}-\d{2}-\d{2})\s*[-–—]\s*(\d{4}-\d{2}-\d{2})",  # "2025-12-10 - 2026-01-09"
-        r"(\d{1,2}/\d{1,2}/\d{4})\s*[-–—]\s*(\d{1,2}/\d{1,2}/\d{4})",  # "12/10/2025 - 01/09/2026"
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, question, re.IGNORECASE)
+    for pattern in _DATE_RANGE_RES:
+        match = pattern.search(question)
         if match:
             try:
                 start_str = match.group(1).strip()
@@ -132,88 +236,293 @@ def parse_date_range(question: str) -> Optional[Dict[str, str]]:
     return None
 
 
+def date_range_span_days(date_range: Optional[DateRange]) -> Optional[int]:
+    """Number of days between date_range start and end, None if no range."""
+    if date_range is None:
+        return None
+    d0 = np.datetime64(date_range.start, "D")
+    d1 = np.datetime64(date_range.end, "D")
+    return abs(int((d1 - d0) / np.timedelta64(1, "D")))
+
+
+# Sentiment codes used in ReviewFrame.sentiment
+SENT_NEGATIVE = -1
+SENT_NEUTRAL = 0
+SENT_POSITIVE = 1
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "positive_count": 0,
+        "negative_count": 0,
+        "neutral_count": 0,
+        "positive_pct": 0.0,
+        "negative_pct": 0.0,
+        "neutral_pct": 0.0,
+        "avg_rating": None,
+        "rated_count": 0,
+    }
+
+
+def _parse_day(value: Any) -> np.datetime64:
+    """Parse a single created_at value to a day, NaT if unparseable."""
+    if not value:
+        return np.datetime64("NaT", "D")
+    s = str(value).strip()
+    try:
+        return np.datetime64(s[:10], "D")
+    except ValueError:
+        pass
+    try:
+        if HAS_DATEUTIL:
+            return np.datetime64(date_parser.parse(s).date(), "D")
+        return np.datetime64(date_parser_parse(s).date(), "D")
+    except Exception:
+        return np.datetime64("NaT", "D")
+
+
+def _parse_days(values: List[Any]) -> np.ndarray:
+    """Parse created_at values to datetime64[D]; ISO strings go through one vectorized call."""
+    try:
+        return np.array([str(v).strip()[:10] if v else "NaT" for v in values], dtype="datetime64[D]")
+    except ValueError:
+        return np.array([_parse_day(v) for v in values], dtype="datetime64[D]")
+
+
+@dataclass
+class ReviewFrame:
+    """
+    Structure-of-arrays view over a list of review dicts.
+    Built once per request so date/product filtering and stats run as NumPy
+    array operations instead of per-dict .get() calls.
+    """
+    reviews: List[Dict]
+    dates: np.ndarray          # datetime64[D], NaT if missing/unparseable
+    date_order: np.ndarray     # permutation that sorts `dates` (NaT last)
+    sorted_dates: np.ndarray   # dates[date_order]
+    product_codes: np.ndarray  # int32 code into product_index
+    product_index: Dict[str, int]  # str(product_id) -> code, same as the old per-dict compare
+    sentiment: np.ndarray      # int8: SENT_NEGATIVE / SENT_NEUTRAL / SENT_POSITIVE
+    rating: np.ndarray         # float32, NaN if no valid 1-5 rating
+    bodies: np.ndarray         # body (or text), as sent - used for quotes/snippets
+    bodies_lower: np.ndarray   # bodies lowercased once - used for keyword matching
+    titles_lower: np.ndarray   # product_title lowercased
+    topic_negative: np.ndarray # bool, review counts toward negative topics
+    topic_positive: np.ndarray # bool, review counts toward positive topics
+
+    @classmethod
+    def from_reviews(cls, reviews: List[Dict]) -> "ReviewFrame":
+        created: List[Any] = []
+        product_index: Dict[str, int] = {}
+        product_codes = np.empty(len(reviews), dtype=np.int32)
+        sentiment: List[int] = []
+        rating: List[float] = []
+        bodies: List[str] = []
+        titles_lower: List[str] = []
+        topic_negative = np.zeros(len(reviews), dtype=bool)
+        topic_positive = np.zeros(len(reviews), dtype=bool)
+
+        code_for = product_index.setdefault
+        for i, r in enumerate(reviews):
+            if not isinstance(r, dict):
+                r = {}
+            created.append(r.get("created_at"))
+            product_codes[i] = code_for(str(r.get("product_id", "")), len(product_index))
+            body = r.get("body") or r.get("text") or ""
+            bodies.append(body if isinstance(body, str) else str(body))
+            titles_lower.append(str(r.get("product_title") or "").lower())
+
+            value = r.get("rating")
+            label = str(r.get("sentiment_label") or r.get("sentiment") or "").lower()
+            # Topic side: truthy rating <= 2 / >= 4, otherwise the sentiment label
+            try:
+                topic_negative[i] = bool(value) and value <= 2
+                topic_positive[i] = bool(value) and value >= 4
+            except TypeError:
+                pass
+            if label == "negative":
+                topic_negative[i] = True
+            elif label == "positive":
+                topic_positive[i] = True
+
+            if isinstance(value, (int, float)) and 1 <= value <= 5:
+                rating.append(value)
+                if value >= 4:
+                    sentiment.append(SENT_POSITIVE)
+                elif value <= 2:
+                    sentiment.append(SENT_NEGATIVE)
+                else:
+                    sentiment.append(SENT_NEUTRAL)
+            else:
+                # Try sentiment_label if rating not available
+                rating.append(np.nan)
+                if label == "positive":
+                    sentiment.append(SENT_POSITIVE)
+                elif label == "negative":
+                    sentiment.append(SENT_NEGATIVE)
+                else:
+                    sentiment.append(SENT_NEUTRAL)
+
+        dates = _parse_days(created)
+        date_order = np.argsort(dates, kind="stable")
+        return cls(
+            reviews=reviews,
+            dates=dates,
+            date_order=date_order,
+            sorted_dates=dates[date_order],
+            product_codes=product_codes,
+            product_index=product_index,
+            sentiment=np.array(sentiment, dtype=np.int8),
+            rating=np.array(rating, dtype=np.float32),
+            bodies=np.array(bodies, dtype=object),
+            bodies_lower=np.array([b.lower() for b in bodies], dtype=object),
+            titles_lower=np.array(titles_lower, dtype=object),
+            topic_negative=topic_negative,
+            topic_positive=topic_positive,
+        )
+
+    def all_indices(self) -> np.ndarray:
+        return np.arange(len(self.reviews), dtype=np.int64)
+
+    def filter_by_date(self, idx: np.ndarray, date_range: Optional[DateRange]) -> np.ndarray:
+        """Keep indices whose day falls in [start, end]; original order is preserved."""
+        if date_range is None:
+            return idx
+        start = np.datetime64(date_range.start, "D")
+        end = np.datetime64(date_range.end, "D")
+        lo = np.searchsorted(self.sorted_dates, start, side="left")
+        hi = np.searchsorted(self.sorted_dates, end, side="right")
+        in_range = np.zeros(len(self.reviews), dtype=bool)
+        in_range[self.date_order[lo:hi]] = True
+        return idx[in_range[idx]]
+
+    def filter_by_product(self, idx: np.ndarray, product_id: Optional[Any]) -> np.ndarray:
+        if not product_id:
+            return idx
+        code = self.product_index.get(str(product_id))
+        if code is None:
+            return idx[:0]
+        return idx[self.product_codes[idx] == code]
+
+    def take(self, idx: np.ndarray) -> List[Dict]:
+        return [self.reviews[i] for i in idx]
+
+    def stats(self, idx: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Same output as compute_stats_from_reviews, computed on the arrays."""
+        idx = self.all_indices() if idx is None else np.asarray(idx, dtype=np.int64)
+        total = int(idx.size)
+        if total == 0:
+            return _empty_stats()
+
+        negative, neutral, positive = sentiment_counts(self.sentiment, idx)
+        avg_rating, rated_count = rating_mean_count(self.rating, idx)
+
+        return {
+            "total": total,
+            "positive_count": positive,
+            "negative_count": negative,
+            "neutral_count": neutral,
+            "positive_pct": round(positive / total * 100, 1),
+            "negative_pct": round(negative / total * 100, 1),
+            "neutral_pct": round(neutral / total * 100, 1),
+            "avg_rating": round(avg_rating, 2) if avg_rating else None,
+            # avg_rating যে কয়টা (1-5 numeric) rating থেকে এসেছে
+            "rated_count": rated_count,
+        }
+
+    def find_keyword(self, idx: np.ndarray, keyword: str, limit: Optional[int] = None) -> np.ndarray:
+        """First `limit` indices in idx whose lowercased body contains keyword, in one vectorized find."""
+        if idx.size == 0:
+            return idx
+        # np.char needs a fixed-width str array; object arrays have no find loop
+        hits = np.char.find(self.bodies_lower[idx].astype(str), keyword.lower()) >= 0
+        return idx[hits][:limit]
+
+    def topics(self, idx: np.ndarray, sentiment: str = "negative", top_k: int = 5) -> List[Tuple[str, int]]:
+        """Top TOPIC_KEYWORDS among idx ("negative"/"positive" side, anything else = all)."""
+        if sentiment == "negative":
+            idx = idx[self.topic_negative[idx]]
+        elif sentiment == "positive":
+            idx = idx[self.topic_positive[idx]]
+
+        keyword_counts: Dict[str, int] = {}
+        bodies_lower = self.bodies_lower
+        for i in idx:
+            for k in sorted(_topic_keyword_hits(bodies_lower[i])):
+                kw = TOPIC_KEYWORDS[k]
+                keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
+
+        sorted_topics = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)
+        return sorted_topics[:top_k]
+
+    def relevant_indices(self, question: str, idx: np.ndarray, k: int = 8) -> np.ndarray:
+        """
+        Lightweight retrieval: score idx by token overlap with question.
+        Returns the top-k indices for evidence/snippets.
+        """
+        if idx.size == 0:
+            return idx
+        q = _NON_ALNUM_RE.sub(" ", (question or "").lower())
+        q_terms = [w for w in q.split() if len(w) >= 3]
+        if not q_terms:
+            return idx[:k]
+
+        bodies_lower = self.bodies_lower
+        titles_lower = self.titles_lower
+        scored: List[Tuple[int, int]] = []
+        for i in idx:
+            body = bodies_lower[i]
+            prod = titles_lower[i]
+            score = 0
+            for t in q_terms:
+                if t in body:
+                    score += 2
+                # Slight boost if product mentioned in question and exists
+                if t in prod:
+                    score += 1
+            if score > 0:
+                scored.append((score, i))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        top = [i for _, i in scored[:k]]
+        if len(top) < k:
+            # fill with recent items to avoid empty evidence
+            picked = set(top)
+            top.extend([i for i in idx if i not in picked][: (k - len(top))])
+        return np.array(top[:k], dtype=np.int64)
+
+    def evidence_quotes(self, question: str, idx: np.ndarray, max_quotes: int = 3) -> List[str]:
+        quotes: List[str] = []
+        for i in self.relevant_indices(question, idx, k=max(8, max_quotes)):
+            txt = self.bodies[i].strip()
+            if not txt:
+                continue
+            q = _quote_max_words(txt, 12)
+            if q and q not in quotes:
+                quotes.append(q)
+            if len(quotes) >= max_quotes:
+                break
+        return quotes
+
+
 def filter_reviews_by_date(reviews: List[Dict], date_range: Optional[Dict[str, str]]) -> List[Dict]:
     """Filter reviews by date range."""
     if not date_range or not reviews:
         return reviews
-    
     try:
-        start = datetime.strptime(date_range["start"], "%Y-%m-%d")
-        end = datetime.strptime(date_range["end"], "%Y-%m-%d")
-        end = end.replace(hour=23, minute=59, second=59)
-    except Exception:
+        validated = DateRange.model_validate(date_range)
+    except ValidationError:
         return reviews
-    
-    filtered = []
-    for r in reviews:
-        created_at = r.get("created_at")
-        if not created_at:
-            continue
-        try:
-            if HAS_DATEUTIL:
-                review_date = date_parser.parse(created_at)
-            else:
-                review_date = date_parser_parse(str(created_at))
-            if start <= review_date <= end:
-                filtered.append(r)
-        except Exception:
-            continue
-    
-    return filtered
+    frame = ReviewFrame.from_reviews(reviews)
+    return frame.take(frame.filter_by_date(frame.all_indices(), validated))
 
 
 def compute_stats_from_reviews(reviews: List[Dict]) -> Dict[str, Any]:
     """Compute statistics from raw reviews."""
     if not reviews:
-        return {
-            "total": 0,
-            "positive_count": 0,
-            "negative_count": 0,
-            "neutral_count": 0,
-            "positive_pct": 0.0,
-            "negative_pct": 0.0,
-            "neutral_pct": 0.0,
-            "avg_rating": None,
-        }
-    
-    total = len(reviews)
-    positive = 0
-    negative = 0
-    neutral = 0
-    ratings = []
-    
-    for r in reviews:
-        rating = r.get("rating")
-        if isinstance(rating, (int, float)) and 1 <= rating <= 5:
-            ratings.append(rating)
-            if rating >= 4:
-                positive += 1
-            elif rating <= 2:
-                negative += 1
-            else:
-                neutral += 1
-        else:
-            # Try sentiment_label if rating not available
-            sentiment = (r.get("sentiment_label") or r.get("sentiment") or "").lower()
-            if sentiment == "positive":
-                positive += 1
-            elif sentiment == "negative":
-                negative += 1
-            else:
-                neutral += 1
-    
-    avg_rating = sum(ratings) / len(ratings) if ratings else None
-    
-    return {
-        "total": total,
-        "positive_count": positive,
-        "negative_count": negative,
-        "neutral_count": neutral,
-        "positive_pct": round((positive / total * 100) if total > 0 else 0, 1),
-        "negative_pct": round((negative / total * 100) if total > 0 else 0, 1),
-        "neutral_pct": round((neutral / total * 100) if total > 0 else 0, 1),
-        "avg_rating": round(avg_rating, 2) if avg_rating else None,
-    }
+        return _empty_stats()
+    return ReviewFrame.from_reviews(reviews).stats()
 
 
 def _mask_emails(text: str) -> str:
@@ -228,12 +537,12 @@ def _mask_emails(text: str) -> str:
             return "***@" + domain
         return (local[0] + "***@" + domain)
 
-    return re.sub(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", repl, text or "")
+    return _EMAIL_RE.sub(repl, text or "")
 
 
 def _quote_max_words(text: str, max_words: int = 12) -> str:
     t = _mask_emails((text or "").strip())
-    t = re.sub(r"\s+", " ", t)
+    t = _WHITESPACE_RE.sub(" ", t)
     words = t.split(" ")
     if len(words) <= max_words:
         return t
@@ -247,94 +556,50 @@ def retrieve_relevant_reviews(question: str, reviews: List[Dict], k: int = 8) ->
     """
     if not reviews:
         return []
-    q = (question or "").lower()
-    q = re.sub(r"[^a-z0-9\s]", " ", q)
-    q_terms = [w for w in q.split() if len(w) >= 3]
-    if not q_terms:
-        return reviews[:k]
-
-    scored: List[Tuple[int, Dict]] = []
-    for r in reviews:
-        body = (r.get("body") or r.get("text") or "").lower()
-        score = 0
-        for t in q_terms:
-            if t in body:
-                score += 2
-        # Slight boost if product mentioned in question and exists
-        prod = (r.get("product_title") or "").lower()
-        for t in q_terms:
-            if t in prod:
-                score += 1
-        if score > 0:
-            scored.append((score, r))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = [r for _, r in scored[:k]]
-    if len(top) < k:
-        # fill with recent items to avoid empty evidence
-        rest = [r for r in reviews if r not in top]
-        top.extend(rest[: (k - len(top))])
-    return top[:k]
+    frame = ReviewFrame.from_reviews(reviews)
+    return frame.take(frame.relevant_indices(question, frame.all_indices(), k))
 
 
 def build_evidence_quotes(question: str, reviews: List[Dict], max_quotes: int = 3) -> List[str]:
-    picks = retrieve_relevant_reviews(question, reviews, k=max(8, max_quotes))
-    quotes: List[str] = []
-    for r in picks:
-        txt = (r.get("body") or r.get("text") or "").strip()
-        if not txt:
-            continue
-        q = _quote_max_words(txt, 12)
-        if q and q not in quotes:
-            quotes.append(q)
-        if len(quotes) >= max_quotes:
-            break
-    return quotes
+    if not reviews:
+        return []
+    frame = ReviewFrame.from_reviews(reviews)
+    return frame.evidence_quotes(question, frame.all_indices(), max_quotes)
+
+# Common keywords to look for
+TOPIC_KEYWORDS: Tuple[str, ...] = (
+    "sizing", "size", "small", "large", "fit",
+    "quality", "durable", "durability", "lasted",
+    "shipping", "delivery", "arrived", "package",
+    "battery", "charge", "charging",
+    "support", "customer service", "help",
+    "price", "expensive", "cheap", "value",
+    "material", "fabric", "color", "design",
+)
+
+if HAS_AHOCORASICK:
+    _TOPIC_AUTOMATON = ahocorasick.Automaton()
+    for _i, _kw in enumerate(TOPIC_KEYWORDS):
+        _TOPIC_AUTOMATON.add_word(_kw, _i)
+    _TOPIC_AUTOMATON.make_automaton()
+
+
+def _topic_keyword_hits(body: str) -> set:
+    """
+    Indices into TOPIC_KEYWORDS that occur (as substrings) in a lowercased body.
+    One automaton pass when pyahocorasick is installed, else one `in` per keyword.
+    """
+    if HAS_AHOCORASICK:
+        return {i for _, i in _TOPIC_AUTOMATON.iter(body)}
+    return {i for i, kw in enumerate(TOPIC_KEYWORDS) if kw in body}
+
 
 def extract_topics_from_reviews(reviews: List[Dict], sentiment: str = "negative", top_k: int = 5) -> List[Tuple[str, int]]:
     """Extract top topics/keywords from reviews."""
-    # Simple keyword extraction (can be enhanced with NLP)
-    keyword_counts: Dict[str, int] = {}
-    
-    for r in reviews:
-        body = (r.get("body") or r.get("text") or "").lower()
-        rating = r.get("rating")
-        sentiment_label = (r.get("sentiment_label") or r.get("sentiment") or "").lower()
-        
-        # Filter by sentiment
-        if sentiment == "negative":
-            if rating and rating <= 2:
-                pass  # Include
-            elif sentiment_label == "negative":
-                pass  # Include
-            else:
-                continue
-        elif sentiment == "positive":
-            if rating and rating >= 4:
-                pass  # Include
-            elif sentiment_label == "positive":
-                pass  # Include
-            else:
-                continue
-        
-        # Common keywords to look for
-        keywords = [
-            "sizing", "size", "small", "large", "fit",
-            "quality", "durable", "durability", "lasted",
-            "shipping", "delivery", "arrived", "package",
-            "battery", "charge", "charging",
-            "support", "customer service", "help",
-            "price", "expensive", "cheap", "value",
-            "material", "fabric", "color", "design",
-        ]
-        
-        for kw in keywords:
-            if kw in body:
-                keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
-    
-    # Sort and return top k
-    sorted_topics = sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)
-    return sorted_topics[:top_k]
+    if not reviews:
+        return []
+    frame = ReviewFrame.from_reviews(reviews)
+    return frame.topics(frame.all_indices(), sentiment, top_k)
 
 
 def format_response_template(
@@ -411,3 +676,162 @@ def generate_export_guidance() -> str:
         "2) Click 'Export CSV' button\n"
         "3) Confirm filter scope matches your needs"
     )
+
+
+# Prompts for the default (LLM) /ai/chat branch
+CHAT_SYSTEM_PROMPT = (
+    "You are an AI assistant helping users understand their review data.\n\n"
+    "CRITICAL RULES:\n"
+    "1. NEVER guess or hallucinate numbers, dates, or percentages.\n"
+    "2. Use ONLY the provided statistics and data.\n"
+    "3. If data is missing, say: 'I don't have that data yet. Please connect a data source or upload reviews.'\n"
+    "4. Always cite numbers from the provided stats.\n"
+    "5. When computing, show brief formula (e.g., 'Positive % = positive_count / total_reviews').\n\n"
+    "Response format:\n"
+    "- Keep responses clean, short, and structured\n"
+    "- ALWAYS start with: Answer:\n"
+    "- Then bullet key numbers\n"
+    "- Then: Insight:\n"
+    "- Then: Next actions:\n"
+    "- If quoting reviews: max 12 words per quote, max 3 quotes\n"
+    "- Use bullets for key numbers\n"
+    "- Provide 1-2 sentence insights\n"
+    "- List actionable next steps\n"
+    "- For deep analysis, include 2-3 example review snippets\n\n"
+    "Privacy: Never reveal emails or personal info. Mask emails as a***@b.com if present.\n\n"
+    "Supported intents:\n"
+    "- Quick stats (total, positive/negative counts)\n"
+    "- Breakdowns by date range, product, rating\n"
+    "- Topics & pain points\n"
+    "- Business recommendations\n"
+    "- Export/CSV guidance\n"
+    "- Screenshot/report UI guidance\n"
+)
+
+# Filled with ReviewFrame.stats() plus the request-specific fields via str.format_map
+CHAT_USER_TEMPLATE = (
+    "Structured data (use ONLY this - never guess):\n"
+    "- date_range: {dr_label}\n"
+    "- total_reviews: {total}\n"
+    "- positive_count: {positive_count}\n"
+    "- negative_count: {negative_count}\n"
+    "- neutral_count: {neutral_count}\n"
+    "- positive_percentage: {positive_pct}\n"
+    "- negative_percentage: {negative_pct}\n"
+    "- neutral_percentage: {neutral_pct}\n"
+    "- average_rating: {avg_rating}\n"
+    "- top_negative_topics: {top_negative_topics}\n"
+    "- top_positive_topics: {top_positive_topics}\n"
+    "- evidence_quotes: {evidence_quotes}\n"
+    "- sample_reviews_count: {sample_count}\n"
+    "- product_analytics: {product_count} products\n\n"
+    "User question: {question}\n\n"
+    "IMPORTANT: If the user asks about something not in the data above, say 'I don't have that data yet' and explain how to get it."
+)
+
+
+class ChatResponseCache:
+    """
+    Small in-memory TTL + LRU cache for /ai/chat responses (serialized JSON bodies).
+    Repeat questions on the same data skip fetch, filtering, stats and the LLM call.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+CHAT_RESPONSE_CACHE = ChatResponseCache()
+
+
+def chat_cache_key(
+    store_domain: Optional[str],
+    date_range: Optional[DateRange],
+    date_range_label: Optional[str],
+    product_id: Optional[str],
+    ql: str,
+    reviews_digest: str,
+    product_count: int,
+) -> Tuple:
+    """
+    Cache key for a chat question; whitespace in the question is normalized.
+    `reviews_digest` is reviews_fingerprint() of the reviews the answer is computed from,
+    so different review content never shares an answer.
+    """
+    range_key = (date_range.start, date_range.end) if date_range is not None else None
+    return (
+        store_domain, range_key, date_range_label, product_id, " ".join(ql.split()),
+        reviews_digest, product_count,
+    )
+
+
+# Review fields ReviewFrame (and the answers built from it) read
+_FINGERPRINT_FIELDS = (
+    "id", "body", "text", "rating", "sentiment_label", "sentiment",
+    "created_at", "product_id", "product_title",
+)
+
+
+def reviews_fingerprint(reviews: List[Dict]) -> Optional[str]:
+    """
+    Content digest of `reviews` (ids plus body, rating, label, date and product fields).
+    None when no fingerprint can be built (no reviews, or a review that is not a dict) -
+    callers must not cache in that case.
+    """
+    if not reviews:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    fields = _FINGERPRINT_FIELDS
+    for r in reviews:
+        if not isinstance(r, dict):
+            return None
+        # repr of the tuple quotes/escapes strings, so field boundaries are unambiguous
+        digest.update(repr(tuple(map(r.get, fields))).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+# Recent ReviewFrames, so follow-up chat turns on the same reviews skip re-normalizing
+REVIEW_FRAME_CACHE = ChatResponseCache(maxsize=16, ttl=300.0)
+
+
+def review_frame_for(
+    reviews: List[Dict],
+    store_domain: Optional[str] = None,
+    reviews_digest: Optional[str] = None,
+) -> ReviewFrame:
+    """
+    ReviewFrame for `reviews`, reused across requests of the same store carrying the same
+    review content (reviews_fingerprint; pass `reviews_digest` if already computed).
+    Never cached without a store_domain or when no fingerprint can be built.
+    """
+    if store_domain is None:
+        return ReviewFrame.from_reviews(reviews)
+    if reviews_digest is None:
+        reviews_digest = reviews_fingerprint(reviews)
+        if reviews_digest is None:
+            return ReviewFrame.from_reviews(reviews)
+
+    key = (store_domain, reviews_digest)
+    frame = REVIEW_FRAME_CACHE.get(key)
+    if frame is None:
+        frame = ReviewFrame.from_reviews(reviews)
+        REVIEW_FRAME_CACHE.put(key, frame)
+    return frame
@@ -0,0 +1,76 @@
+# ============ FAST STATS ============
+# Chat handler এর ReviewFrame stats reductions (sentiment count, rating average)
+# numba থাকলে JIT kernel (single-threaded, nogil), না থাকলে numpy fallback
+# Sentiment codes: -1 = negative, 0 = neutral, 1 = positive (chat_handler.SENT_*)
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Kernels parallel=True না - frame এ ~10k review এর বেশি থাকে না, তাতে prange launch
+# কোনো লাভ দেয় না, আর threading layer (process-global config, fork/thread safety) লাগে না
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Chat handler এগুলো asyncio.to_thread থেকে একসাথে call করে। Kernels nogil আর কোনো shared
+# state লেখে না (threading layer ও নেই), তাই lock ছাড়াই একাধিক thread থেকে চলতে পারে
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, nogil=True)
+    def _sent_counts(sent, idx):
+        neg = 0
+        neu = 0
+        pos = 0
+        for k in range(idx.size):
+            s = sent[idx[k]]
+            if s == 1:
+                pos += 1
+            elif s == -1:
+                neg += 1
+            else:
+                neu += 1
+        return neg, neu, pos
+
+    @njit(cache=True, nogil=True)
+    def _rating_sum_count(rating, idx):
+        total = 0.0
+        n = 0
+        for k in range(idx.size):
+            v = rating[idx[k]]
+            if not np.isnan(v):
+                total += v
+                n += 1
+        return total, n
+
+    # Import এর সময়ই compile করে রাখছি যাতে প্রথম request JIT cost না দেয়
+    _sent_counts(np.zeros(1, np.int8), np.zeros(1, np.int64))
+    _rating_sum_count(np.zeros(1, np.float32), np.zeros(1, np.int64))
+
+
+def sentiment_counts(sent: np.ndarray, idx: np.ndarray) -> Tuple[int, int, int]:
+    """
+    sent[idx] এর মধ্যে (negative, neutral, positive) count return করে।
+    """
+    if NUMBA_AVAILABLE:
+        neg, neu, pos = _sent_counts(sent, idx)
+        return int(neg), int(neu), int(pos)
+    neg, neu, pos = np.bincount(sent[idx] + 1, minlength=3)
+    return int(neg), int(neu), int(pos)
+
+
+def rating_mean_count(rating: np.ndarray, idx: np.ndarray) -> Tuple[Optional[float], int]:
+    """
+    rating[idx] এর NaN বাদে (average, কতগুলো rating) - কোনো rating না থাকলে (None, 0)।
+    """
+    if NUMBA_AVAILABLE:
+        total, n = _rating_sum_count(rating, idx)
+    else:
+        selected = rating[idx].astype(np.float64)
+        valid = selected[~np.isnan(selected)]
+        total, n = valid.sum(), valid.size
+    n = int(n)
+    return (float(total) / n if n else None), n
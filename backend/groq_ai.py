@@ -11,9 +11,12 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import json
 import os
-from typing import Any, Optional, Sequence
+import random
+from typing import Any, AsyncIterator, Optional, Sequence
 
 import httpx
 
@@ -23,9 +26,18 @@ GROQ_BASE_URL = "https://api.groq.com/openai/v1"
 DEFAULT_MODEL = "llama-3.1-8b-instant"
 
 
+# Transient error - এগুলো হলে একটু wait করে আবার try করব
+RETRYABLE_STATUS = frozenset({429, 503})
+MAX_ATTEMPTS = 4
+
+
 class GroqError(Exception):
     """Groq call fail হলে custom error"""
 
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        self.status_code = status_code
+        super().__init__(message)
+
 
 # Simple in-memory cache (একই prompt বারবার call avoid)
 _CACHE: dict[str, str] = {}
@@ -93,7 +105,7 @@ async def groq_chat_completion(
                 msg = data.get("error", {}).get("message") or str(data)
             except Exception:
                 msg = resp.text
-            raise GroqError(f"Groq API error ({resp.status_code}): {msg}")
+            raise GroqError(f"Groq API error ({resp.status_code}): {msg}", status_code=resp.status_code)
 
         data = resp.json()
         content = (
@@ -114,3 +126,83 @@ async def groq_chat_completion(
         raise GroqError(f"Groq request failed: {str(e)}") from e
 
 
+async def safe_groq_chat_completion(**kwargs: Any) -> str:
+    """
+    groq_chat_completion এর retry wrapper।
+    429/503 (rate limit / overloaded) হলে exponential backoff + jitter দিয়ে আবার try করে,
+    যাতে transient error client পর্যন্ত না যায়। বাকি error সরাসরি raise হয়।
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await groq_chat_completion(**kwargs)
+        except GroqError as e:
+            if attempt == MAX_ATTEMPTS - 1 or e.status_code not in RETRYABLE_STATUS:
+                raise
+            await asyncio.sleep((2 ** attempt) * 0.5 + random.random() * 0.1)
+    raise GroqError("Groq retry attempts exhausted")
+
+
+async def groq_chat_completion_stream(
+    *,
+    messages: Sequence[dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.2,
+    max_tokens: int = 256,
+    timeout_s: float = 30.0,
+) -> AsyncIterator[str]:
+    """
+    groq_chat_completion এর streaming version - token আসার সাথে সাথে content delta yield করে।
+    Full response এর জন্য wait করতে হয় না, তাই client প্রথম chunk অনেক আগে পায়।
+    Streamed answer cache হয় না।
+    """
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise GroqError("GROQ_API_KEY not set in backend environment")
+
+    url = f"{GROQ_BASE_URL}/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    payload: dict[str, Any] = {
+        "model": model,
+        "messages": [dict(m) for m in messages],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+    try:
+        async with httpx.AsyncClient(timeout=timeout_s) as client:
+            async with client.stream("POST", url, headers=headers, json=payload) as resp:
+                if resp.status_code >= 400:
+                    body = await resp.aread()
+                    try:
+                        data = json.loads(body)
+                        msg = data.get("error", {}).get("message") or str(data)
+                    except Exception:
+                        msg = body.decode("utf-8", errors="replace")
+                    raise GroqError(f"Groq API error ({resp.status_code}): {msg}", status_code=resp.status_code)
+
+                # OpenAI-compatible SSE: "data: {...}" lines, শেষে "data: [DONE]"
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = line[5:].strip()
+                    if chunk == "[DONE]":
+                        break
+                    # Malformed/অপ্রত্যাশিত shape এর chunk skip - একটা খারাপ line এ পুরো stream মরবে না
+                    try:
+                        delta = (
+                            json.loads(chunk).get("choices", [{}])[0]
+                            .get("delta", {})
+                            .get("content")
+                        )
+                    except (ValueError, IndexError, AttributeError, TypeError):
+                        continue
+                    if isinstance(delta, str) and delta:
+                        yield delta
+    except httpx.TimeoutException as e:
+        raise GroqError("Groq request timed out") from e
+    except httpx.RequestError as e:
+        raise GroqError(f"Groq request failed: {str(e)}") from e
@@ -5,13 +5,15 @@ from .shopify import (
     fetch_shopify_reviews,
     ShopifyClient,
     ShopifyAPIError,
-    SUPPORTED_REVIEW_APPS
+    SUPPORTED_REVIEW_APPS,
+    JUDGE_ME_ALIASES
 )
 
 __all__ = [
     'fetch_shopify_reviews',
     'ShopifyClient', 
     'ShopifyAPIError',
-    'SUPPORTED_REVIEW_APPS'
+    'SUPPORTED_REVIEW_APPS',
+    'JUDGE_ME_ALIASES'
 ]
 
@@ -23,6 +23,8 @@ For production use, you'll need to:
 - Or use webhooks to sync reviews from Shopify apps
 """
 
+import asyncio
+import re
 import httpx
 from typing import Optional
 from dataclasses import dataclass
@@ -33,6 +35,16 @@ from dataclasses import dataclass
 # Shopify API version - update as needed
 SHOPIFY_API_VERSION = "2024-01"
 
+# Shopify leaky-bucket rate limit header (e.g. "3/40" = 40 এর মধ্যে 3 used)
+CALL_LIMIT_HEADER = "X-Shopify-Shop-Api-Call-Limit"
+
+# review_app এর যে নামগুলো Judge.me বোঝায় (lowercase)
+JUDGE_ME_ALIASES = frozenset({"judge_me", "judge.me"})
+
+# Review body থেকে HTML tags remove - module load এ একবারই compile
+# (re.sub(str) re এর internal cache এ নির্ভর করে, অন্য কেউ evict করলে আবার compile হয়)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
 # Supported third-party review apps (for reference)
 SUPPORTED_REVIEW_APPS = {
     "judge_me": {
@@ -81,6 +93,35 @@ class ShopifyAPIError(Exception):
         super().__init__(self.message)
 
 
+# ============ RATE LIMIT HELPERS ============
+
+def _call_limit_delay(header_value: Optional[str]) -> float:
+    """
+    Call-limit header দেখে পরের request এর আগে কত সেকেন্ড wait করবে সেটা বের করে।
+    
+    - Bucket 25% এর কম full: wait নেই
+    - 25-50%: 100ms
+    - 50% এর বেশি: exponential backoff (full bucket এ ~1.4s)
+    
+    Header না থাকলে বা parse না হলে 0 return করে।
+    """
+    if not header_value:
+        return 0.0
+    try:
+        used, cap = map(int, header_value.split("/"))
+    except ValueError:
+        return 0.0
+    if cap <= 0:
+        return 0.0
+    
+    ratio = used / cap
+    if ratio < 0.25:
+        return 0.0
+    if ratio < 0.5:
+        return 0.1
+    return 0.5 * 2 ** (ratio * 3 - 1.5)
+
+
 # ============ DATA CLASSES ============
 
 @dataclass
@@ -148,6 +189,9 @@ class ShopifyClient:
             "X-Shopify-Access-Token": access_token,
             "Content-Type": "application/json"
         }
+        
+        # শেষ response এর rate-limit header থেকে হিসাব করা wait (seconds)
+        self._throttle_delay = 0.0
     
     def _normalize_domain(self, domain: str) -> str:
         """
@@ -189,6 +233,10 @@ class ShopifyClient:
         """
         url = f"{self.base_url}{endpoint}"
         
+        # Bucket প্রায় full হলে একটু অপেক্ষা করছি, না হলে সাথে সাথে পাঠাচ্ছি
+        if self._throttle_delay > 0:
+            await asyncio.sleep(self._throttle_delay)
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
             try:
                 response = await client.request(
@@ -198,6 +246,7 @@ class ShopifyClient:
                     params=params,
                     json=json_data
                 )
+                self._throttle_delay = _call_limit_delay(response.headers.get(CALL_LIMIT_HEADER))
                 
                 # Check for HTTP errors
                 if response.status_code >= 400:
@@ -369,6 +418,9 @@ class JudgeMeClient:
         self.shop_domain = self._normalize_shop_domain(shop_domain)
         self.api_token = api_token
         self.base_url = "https://judge.me/api/v1"
+        
+        # Pagination এর সময় rate-limit header দেখে adaptive wait
+        self._throttle_delay = 0.0
     
     def _normalize_shop_domain(self, domain: str) -> str:
         """
@@ -425,9 +477,13 @@ class JudgeMeClient:
             "page": page
         }
         
+        if self._throttle_delay > 0:
+            await asyncio.sleep(self._throttle_delay)
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
             try:
                 response = await client.get(url, params=params)
+                self._throttle_delay = _call_limit_delay(response.headers.get(CALL_LIMIT_HEADER))
                 
                 # Error handling
                 if response.status_code >= 400:
@@ -518,8 +574,7 @@ class JudgeMeClient:
                         
                         # HTML tags remove
                         if body:
-                            import re
-                            body = re.sub(r'<[^>]+>', '', str(body))
+                            body = _HTML_TAG_RE.sub('', str(body))
                             body = body.strip()
                             
                             if len(body) >= 10:
@@ -625,8 +680,7 @@ class JudgeMeClient:
                         
                         # HTML tags remove করছি
                         if body:
-                            import re
-                            body = re.sub(r'<[^>]+>', '', str(body))
+                            body = _HTML_TAG_RE.sub('', str(body))
                             body = body.strip()
                             
                             # Minimum length check (at least 10 characters)
@@ -698,7 +752,7 @@ async def fetch_shopify_reviews_with_metadata(
     
     # Judge.me integration - full metadata সহ
     if review_app and review_app_token:
-        if review_app.lower() == "judge_me" or review_app.lower() == "judge.me":
+        if review_app.lower() in JUDGE_ME_ALIASES:
             try:
                 judge_me = JudgeMeClient(
                     shop_domain=store_domain,
@@ -782,7 +836,7 @@ async def fetch_shopify_reviews(
     # ========== APPROACH 1: Third-Party Review App ==========
     # Judge.me বা অন্য review app ব্যবহার করলে এটা priority
     if review_app and review_app_token:
-        if review_app.lower() == "judge_me" or review_app.lower() == "judge.me":
+        if review_app.lower() in JUDGE_ME_ALIASES:
             try:
                 judge_me = JudgeMeClient(
                     shop_domain=store_domain,  # store_domain normalize হবে JudgeMeClient এ
@@ -830,8 +884,7 @@ async def fetch_shopify_reviews(
     for review in reviews:
         if isinstance(review, str):
             # HTML tags remove
-            import re
-            text = re.sub(r'<[^>]+>', '', review)
+            text = _HTML_TAG_RE.sub('', review)
             # Extra whitespace remove
             text = ' '.join(text.split())
             # Minimum length check
@@ -8,17 +8,37 @@ from fastapi import FastAPI, HTTPException
 # এটা দরকার কারণ frontend (React) আলাদা port এ চলবে
 # CORS না থাকলে browser frontend থেকে API call block করবে
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 
 # Environment variables load করার জন্য
 # .env file থেকে sensitive data (API tokens) load করবে
 from dotenv import load_dotenv
 import os
-import re
-from datetime import datetime
+import asyncio
+import logging
+import orjson
+from contextlib import asynccontextmanager
+from operator import itemgetter
+from typing import Optional
 
 # .env file load করছি (যদি থাকে)
 load_dotenv()
 
+# Judge.me API token একবারই পড়ে রাখছি (প্রতি request এ os.getenv না করে)
+# .env বদলালে server restart করতে হবে
+JUDGE_ME_API_TOKEN_ENV: Optional[str] = os.getenv("JUDGE_ME_API_TOKEN")
+
+# /ai/chat debug log - LOG_LEVEL=DEBUG দিলে দেখা যাবে, default এ শুধু warning/error
+# (message lazy format হয়, level বন্ধ থাকলে string বানানোই হয় না)
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "").strip().upper()
+# ভুল নাম (যেমন "DEBG") দিলে import এ ValueError না দিয়ে INFO তে চলে
+_LOG_LEVEL_VALID = isinstance(logging.getLevelName(_LOG_LEVEL), int)
+if _LOG_LEVEL:
+    logging.basicConfig(level=_LOG_LEVEL if _LOG_LEVEL_VALID else logging.INFO)
+logger = logging.getLogger("ai_chat")
+if _LOG_LEVEL and not _LOG_LEVEL_VALID:
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", _LOG_LEVEL)
+
 # আমাদের তৈরি করা schemas import করছি
 # এগুলো request/response এর structure define করে
 from schemas import (
@@ -37,13 +57,14 @@ from schemas import (
     GroqCampaignIdeaRequest,
     GroqCampaignIdeaResponse,
     AiChatRequest,
-    AiChatResponse
+    AiChatResponse,
+    DateRange
 )
 
 # আমাদের তৈরি করা ML models import করছি
-# analyzer = trained SentimentAnalyzer instance
+# get_analyzer = shared trained SentimentAnalyzer (প্রথম call এ load/train হয়)
 # TopicExtractor = topic বের করার class
-from models import analyzer, TopicExtractor
+from models import get_analyzer, PredictionBatch, TopicExtractor
 
 # Shopify integration
 # এটা Shopify store থেকে reviews fetch করে
@@ -52,21 +73,34 @@ from integrations.shopify import (
     fetch_shopify_reviews_with_metadata,
     ShopifyAPIError,
     SUPPORTED_REVIEW_APPS,
+    JUDGE_ME_ALIASES,
     ShopifyClient
 )
 
 # Groq AI integration (LLM)
-from groq_ai import groq_chat_completion, DEFAULT_MODEL, GroqError
+from groq_ai import safe_groq_chat_completion, groq_chat_completion_stream, DEFAULT_MODEL, GroqError
 
 
 # ============ APP SETUP ============
 
+# Server start হওয়ার সময় model load + একবার dummy predict + topic extraction চালাচ্ছি
+# যাতে প্রথম real request এ model load/warm-up এর latency না লাগে
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    get_analyzer().predict(["warmup"])
+    TopicExtractor.extract_topics(["good", "bad"], ["positive", "negative"], top_k=1)
+    yield
+
+
 # FastAPI app তৈরি করছি
 # title, description, version = API documentation এ দেখাবে
 app = FastAPI(
     title="AI Review Analyzer",
     description="Product reviews analyze করে sentiment ও topics বের করে",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson stdlib json এর চেয়ে অনেক দ্রুত serialize করে (বড় list response এ কাজে লাগে)
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware যোগ করছি
@@ -86,6 +120,27 @@ app.add_middleware(
 )
 
 
+# Groq endpoints এ try/except রাখছি না - GroqError এখানে একবারেই 500 এ convert হয়
+@app.exception_handler(GroqError)
+async def groq_error_handler(_request, exc: GroqError):
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+# ============ HELPERS ============
+
+# (topic, count) pair - LLM context এ topic tuple এর প্রথম দুইটা field
+_topic_pair = itemgetter(0, 1)
+
+def sse_event(data: dict, event: Optional[str] = None) -> bytes:
+    """
+    একটা Server-Sent Events frame বানায় (text/event-stream)।
+    """
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    if event:
+        frame = f"event: {event}\n".encode("utf-8") + frame
+    return frame
+
+
 # ============ API ENDPOINTS ============
 
 # ---------- Health Check Endpoint ----------
@@ -129,18 +184,18 @@ def analyze_reviews(request: ReviewRequest):
     
     # ---------- Step 2: Sentiment Prediction ----------
     # আমাদের trained model দিয়ে sentiment predict করছি
-    # predictions = list of dicts with text, sentiment, confidence
-    predictions = analyzer.predict(request.reviews)
+    # predictions = PredictionBatch (text, sentiment code, confidence columns)
+    predictions = get_analyzer().predict(request.reviews)
     
     # ---------- Step 3: Get Summary Statistics ----------
     # Total, positive count, negative count, percentages বের করছি
-    summary = analyzer.get_prediction_summary(predictions)
+    summary = get_analyzer().get_prediction_summary(predictions)
     
     # ---------- Step 4: Extract Topics ----------
     # Positive ও negative topics আলাদা করে বের করছি
     
     # প্রথমে সব sentiments এর list বানাচ্ছি
-    sentiments = [p["sentiment"] for p in predictions]
+    sentiments = predictions.labels()
     
     # TopicExtractor দিয়ে topics বের করছি
     # top_k=5 মানে top 5 টা topics প্রতিটা category তে
@@ -159,7 +214,7 @@ def analyze_reviews(request: ReviewRequest):
             sentiment=p["sentiment"],
             confidence=p["confidence"]
         )
-        for p in predictions[:10]  # প্রথম 10 টা নিচ্ছি
+        for p in predictions.to_dicts(10)  # প্রথম 10 টা নিচ্ছি
     ]
     
     # ---------- Step 6: Build Response ----------
@@ -189,33 +244,22 @@ def analyze_reviews(request: ReviewRequest):
         sample_reviews=sample_reviews
     )
     
-    return response
+    # Model এখানেই validate হয়েছে - ORJSONResponse দিলে response_model এর দ্বিতীয়বার validation skip হয়
+    return ORJSONResponse(response.model_dump())
 
 
-# ---------- Shopify Integration Endpoint ----------
-# Shopify store থেকে reviews fetch করে analyze করে
+# ---------- Shopify Analysis Helpers ----------
+# /analyze/shopify এবং /analyze/shopify/stream দুটোই এগুলো ব্যবহার করে
 
-@app.post("/analyze/shopify", response_model=AnalysisResponse)
-async def analyze_shopify_reviews(request: ShopifyRequest):
+async def load_shopify_reviews(request: ShopifyRequest) -> tuple[list[str], Optional[list[dict]]]:
     """
-    Shopify store থেকে reviews fetch করে sentiment analysis করে।
+    Request validate করে Shopify/Judge.me থেকে reviews fetch করে।
     
-    Input: ShopifyRequest (store_domain, access_token, optional review_app details)
-    Output: AnalysisResponse (same as /analyze-reviews)
+    Returns:
+        (review texts, metadata list বা None)
     
-    IMPORTANT NOTES:
-    ----------------
-    1. Shopify Admin API তে native reviews API নেই।
-    2. Reviews সাধারণত third-party apps (Judge.me, Loox) দিয়ে manage হয়।
-    3. যদি review_app এবং review_app_token দাও, সেই app এর API ব্যবহার করবে।
-    4. না দিলে product metafields থেকে reviews খোঁজার চেষ্টা করবে।
-    5. রিভিউ না পেলে এখন 404 error ফিরিয়ে দেয় (demo fallback নেই)।
-    
-    Shopify Access Token পেতে:
-    1. Shopify Admin > Settings > Apps and sales channels
-    2. Develop apps > Create an app
-    3. Configure Admin API scopes: read_products, read_content
-    4. Install app and copy the Admin API access token
+    Raises:
+        HTTPException: invalid input, API error, বা কোনো review না পেলে
     """
     
     # ---------- Step 1: Validate Store Domain ----------
@@ -236,15 +280,14 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
     # যদি review_app_token না দেওয়া হয় কিন্তু Judge.me app use করা হচ্ছে,
     # তাহলে environment variable থেকে token load করব
     review_app_token = request.review_app_token
+    is_judge_me = (request.review_app or "").lower() in JUDGE_ME_ALIASES
     
-    if (request.review_app and 
-        (request.review_app.lower() == "judge_me" or request.review_app.lower() == "judge.me") and
-        not review_app_token):
+    if is_judge_me and not review_app_token:
         # Environment variable থেকে Judge.me token load করছি
-        env_token = os.getenv("JUDGE_ME_API_TOKEN")
+        env_token = JUDGE_ME_API_TOKEN_ENV
         if env_token:
             review_app_token = env_token
-            print("Using Judge.me API token from environment variable")
+            logger.info("Using Judge.me API token from environment variable")
         else:
             raise HTTPException(
                 status_code=400,
@@ -254,7 +297,7 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
     # ---------- Step 3: Fetch Reviews from Shopify ----------
     # Judge.me ব্যবহার করলে full metadata সহ reviews fetch করব
     try:
-        if review_app_token and (request.review_app and (request.review_app.lower() == "judge_me" or request.review_app.lower() == "judge.me")):
+        if review_app_token and is_judge_me:
             # Full metadata সহ reviews fetch করছি
             reviews_with_metadata = await fetch_shopify_reviews_with_metadata(
                 store_domain=request.store_domain,
@@ -265,7 +308,7 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
             )
             
             # Reviews text extract করছি analysis এর জন্য
-            reviews = [r.get("body", "") for r in reviews_with_metadata if r.get("body")]
+            reviews = [b for r in reviews_with_metadata if (b := r.get("body"))]
             review_metadata = reviews_with_metadata  # Metadata store করছি
         else:
             # Normal fetch (text only)
@@ -308,23 +351,16 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
             detail="No reviews found in this Shopify store. Make sure you have a review app installed (Judge.me, Loox, etc.) or reviews stored in product metafields."
         )
     
-    # ---------- Step 5: Run Sentiment Analysis ----------
-    # এখন থেকে /analyze-reviews এর মতোই logic
-    predictions = analyzer.predict(reviews)
-    summary = analyzer.get_prediction_summary(predictions)
-    
-    # ---------- Step 6: Extract Topics ----------
-    sentiments = [p["sentiment"] for p in predictions]
-    positive_topics, negative_topics = TopicExtractor.extract_topics(
-        reviews=reviews,
-        sentiments=sentiments,
-        top_k=5
-    )
-    
-    # ---------- Step 7: Prepare Sample Reviews ----------
+    return reviews, review_metadata
+
+
+def build_sample_reviews(predictions: PredictionBatch, review_metadata: Optional[list[dict]]) -> list[ReviewResult]:
+    """
+    প্রথম 10 টা prediction থেকে sample reviews বানায় (metadata থাকলে সেটাও সহ)।
+    """
     # Full metadata সহ reviews prepare করছি
     sample_reviews = []
-    for i, p in enumerate(predictions[:10]):
+    for i, p in enumerate(predictions.to_dicts(10)):
         review_result = ReviewResult(
             text=p["text"],
             sentiment=p["sentiment"],
@@ -342,6 +378,54 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
         
         sample_reviews.append(review_result)
     
+    return sample_reviews
+
+
+# ---------- Shopify Integration Endpoint ----------
+# Shopify store থেকে reviews fetch করে analyze করে
+
+@app.post("/analyze/shopify", response_model=AnalysisResponse)
+async def analyze_shopify_reviews(request: ShopifyRequest):
+    """
+    Shopify store থেকে reviews fetch করে sentiment analysis করে।
+    
+    Input: ShopifyRequest (store_domain, access_token, optional review_app details)
+    Output: AnalysisResponse (same as /analyze-reviews)
+    
+    IMPORTANT NOTES:
+    ----------------
+    1. Shopify Admin API তে native reviews API নেই।
+    2. Reviews সাধারণত third-party apps (Judge.me, Loox) দিয়ে manage হয়।
+    3. যদি review_app এবং review_app_token দাও, সেই app এর API ব্যবহার করবে।
+    4. না দিলে product metafields থেকে reviews খোঁজার চেষ্টা করবে।
+    5. রিভিউ না পেলে এখন 404 error ফিরিয়ে দেয় (demo fallback নেই)।
+    
+    Shopify Access Token পেতে:
+    1. Shopify Admin > Settings > Apps and sales channels
+    2. Develop apps > Create an app
+    3. Configure Admin API scopes: read_products, read_content
+    4. Install app and copy the Admin API access token
+    """
+    
+    # ---------- Step 1-4: Validate + Fetch Reviews ----------
+    reviews, review_metadata = await load_shopify_reviews(request)
+    
+    # ---------- Step 5: Run Sentiment Analysis ----------
+    # এখন থেকে /analyze-reviews এর মতোই logic
+    predictions = get_analyzer().predict(reviews)
+    summary = get_analyzer().get_prediction_summary(predictions)
+    
+    # ---------- Step 6: Extract Topics ----------
+    sentiments = predictions.labels()
+    positive_topics, negative_topics = TopicExtractor.extract_topics(
+        reviews=reviews,
+        sentiments=sentiments,
+        top_k=5
+    )
+    
+    # ---------- Step 7: Prepare Sample Reviews ----------
+    sample_reviews = build_sample_reviews(predictions, review_metadata)
+    
     # ---------- Step 8: Build Response ----------
     response = AnalysisResponse(
         total_reviews=summary["total"],
@@ -368,9 +452,56 @@ async def analyze_shopify_reviews(request: ShopifyRequest):
         sample_reviews=sample_reviews
     )
     
-    return response
+    # Model এখানেই validate হয়েছে - ORJSONResponse দিলে response_model এর দ্বিতীয়বার validation skip হয়
+    return ORJSONResponse(response.model_dump())
 
 
+# ---------- Shopify Streaming Endpoint ----------
+# বড় store এ পুরো response এর জন্য অপেক্ষা না করে frontend progressively render করতে পারে
+
+@app.post("/analyze/shopify/stream")
+async def analyze_shopify_reviews_stream(request: ShopifyRequest):
+    """
+    /analyze/shopify এর NDJSON streaming version।
+    
+    প্রতিটা line একটা JSON object:
+    1. {"type": "header", ...}  - total + sentiment counts/percentages
+    2. {"type": "sample", ...}  - প্রতিটা sample review (max 10)
+    3. {"type": "topics", ...}  - top positive/negative topics (শেষে)
+    
+    Validation/fetch error হলে stream শুরু হওয়ার আগেই normal HTTP error দেয়।
+    """
+    reviews, review_metadata = await load_shopify_reviews(request)
+    predictions = get_analyzer().predict(reviews)
+    summary = get_analyzer().get_prediction_summary(predictions)
+    
+    async def generate():
+        yield orjson.dumps({
+            "type": "header",
+            "total_reviews": summary["total"],
+            "positive_count": summary["positive_count"],
+            "negative_count": summary["negative_count"],
+            "positive_percentage": summary["positive_percentage"],
+            "negative_percentage": summary["negative_percentage"]
+        }) + b"\n"
+        
+        for sample in build_sample_reviews(predictions, review_metadata):
+            yield orjson.dumps({"type": "sample", **sample.model_dump()}) + b"\n"
+        
+        # Topics সবার শেষে - header ও samples এর পরে compute হয়
+        positive_topics, negative_topics = TopicExtractor.extract_topics(
+            reviews=reviews,
+            sentiments=predictions.labels(),
+            top_k=5
+        )
+        yield orjson.dumps({
+            "type": "topics",
+            "top_positive_topics": positive_topics,
+            "top_negative_topics": negative_topics
+        }) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 # ---------- Shopify Info Endpoint ----------
 # Supported review apps এর তথ্য দেয়
 
@@ -408,7 +539,8 @@ async def get_shopify_products(request: ShopifyRequest):
         await client.verify_connection()
         products = await client.get_products(limit=min(request.limit or 250, 250))
 
-        return [
+        # Response সরাসরি ORJSONResponse হিসেবে দিচ্ছি - response_model এর দ্বিতীয়বার validation skip হয়
+        return ORJSONResponse([
             ShopifyProductOut(
                 id=p.id,
                 title=p.title,
@@ -417,9 +549,9 @@ async def get_shopify_products(request: ShopifyRequest):
                 product_type=p.product_type,
                 tags=p.tags,
                 image_url=p.image_url
-            )
+            ).model_dump()
             for p in products
-        ]
+        ])
     except ShopifyAPIError as e:
         raise HTTPException(status_code=e.status_code or 500, detail=e.message)
     except Exception as e:
@@ -443,7 +575,7 @@ async def get_shopify_reviews(request: ShopifyRequest):
 
     # Judge.me token resolve করছি
     review_app = request.review_app or "judge_me"
-    review_app_token = request.review_app_token or os.getenv("JUDGE_ME_API_TOKEN")
+    review_app_token = request.review_app_token or JUDGE_ME_API_TOKEN_ENV
     if not review_app_token:
         raise HTTPException(status_code=400, detail="JUDGE_ME_API_TOKEN not set in backend environment")
 
@@ -455,7 +587,7 @@ async def get_shopify_reviews(request: ShopifyRequest):
             review_app=review_app,
             review_app_token=review_app_token
         )
-        return [
+        return ORJSONResponse([
             JudgeMeReviewOut(
                 id=r.get("id") or 0,
                 body=r.get("body", ""),
@@ -464,10 +596,10 @@ async def get_shopify_reviews(request: ShopifyRequest):
                 product_title=r.get("product_title"),
                 product_id=r.get("product_id"),
                 rating=r.get("rating")
-            )
+            ).model_dump()
             for r in reviews
             if r.get("body")
-        ]
+        ])
     except ShopifyAPIError as e:
         raise HTTPException(status_code=e.status_code or 500, detail=e.message)
     except Exception as e:
@@ -491,7 +623,7 @@ async def get_product_analytics(request: ShopifyRequest):
         raise HTTPException(status_code=400, detail="access_token is required")
 
     review_app = request.review_app or "judge_me"
-    review_app_token = request.review_app_token or os.getenv("JUDGE_ME_API_TOKEN")
+    review_app_token = request.review_app_token or JUDGE_ME_API_TOKEN_ENV
     if not review_app_token:
         raise HTTPException(status_code=400, detail="JUDGE_ME_API_TOKEN not set in backend environment")
 
@@ -516,16 +648,16 @@ async def get_product_analytics(request: ShopifyRequest):
         analytics: list[ProductAnalyticsOut] = []
 
         for _key, group in grouped.items():
-            texts = [g.get("body", "") for g in group if g.get("body")]
+            texts = [b for r in group if (b := r.get("body"))]
             if not texts:
                 continue
 
             # Sentiment predictions
-            preds = analyzer.predict(texts)
-            summary = analyzer.get_prediction_summary(preds)
+            preds = get_analyzer().predict(texts)
+            summary = get_analyzer().get_prediction_summary(preds)
 
             # Topics
-            sentiments = [p["sentiment"] for p in preds]
+            sentiments = preds.labels()
             pos_topics, neg_topics = TopicExtractor.extract_topics(
                 reviews=texts,
                 sentiments=sentiments,
@@ -552,7 +684,7 @@ async def get_product_analytics(request: ShopifyRequest):
 
         # Sort: বেশি review যাদের, আগে
         analytics.sort(key=lambda a: a.review_count, reverse=True)
-        return analytics
+        return ORJSONResponse([a.model_dump() for a in analytics])
     except ShopifyAPIError as e:
         raise HTTPException(status_code=e.status_code or 500, detail=e.message)
     except Exception as e:
@@ -574,6 +706,7 @@ def root():
         "endpoints": {
             "manual_analysis": "POST /analyze-reviews",
             "shopify_integration": "POST /analyze/shopify",
+            "shopify_integration_stream": "POST /analyze/shopify/stream",
             "supported_apps": "GET /shopify/supported-apps"
         }
     }
@@ -582,6 +715,9 @@ def root():
 # ============ GROQ AI ENDPOINTS ============
 # NOTE: Bengali comments রাখা হলো
 
+# /ai/reply এ যে tone গুলো support করি
+_VALID_TONES = frozenset({"empathetic", "formal", "short"})
+
 @app.post("/ai/reply", response_model=GroqReplyResponse)
 async def generate_ai_reply(request: GroqReplyRequest):
     """
@@ -591,7 +727,7 @@ async def generate_ai_reply(request: GroqReplyRequest):
         raise HTTPException(status_code=400, detail="review_text is required")
 
     tone = (request.tone or "empathetic").strip().lower()
-    if tone not in ("empathetic", "formal", "short"):
+    if tone not in _VALID_TONES:
         tone = "empathetic"
 
     # System prompt (brand-safe + helpful)
@@ -624,18 +760,15 @@ async def generate_ai_reply(request: GroqReplyRequest):
         + "Write the reply now."
     )
 
-    try:
-        reply = await groq_chat_completion(
-            system_prompt=system,
-            user_prompt=user,
-            model=DEFAULT_MODEL,
-            temperature=0.2,
-            max_tokens=220,
-            use_cache=True
-        )
-        return GroqReplyResponse(reply_text=reply, model="assistant")
-    except GroqError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    reply = await safe_groq_chat_completion(
+        system_prompt=system,
+        user_prompt=user,
+        model=DEFAULT_MODEL,
+        temperature=0.2,
+        max_tokens=220,
+        use_cache=True
+    )
+    return GroqReplyResponse(reply_text=reply, model="assistant")
 
 
 @app.post("/ai/summary", response_model=GroqSummaryResponse)
@@ -666,25 +799,22 @@ async def generate_ai_summary(request: GroqSummaryRequest):
         "- <action 2>\n"
         "- <action 3>\n"
     )
-    try:
-        text = await groq_chat_completion(
-            system_prompt=system,
-            user_prompt=user,
-            model=DEFAULT_MODEL,
-            temperature=0.3,
-            max_tokens=350,
-            use_cache=True
-        )
-        # Very simple parse
-        summary = text
-        actions: list[str] = []
-        if "Actions:" in text:
-            parts = text.split("Actions:", 1)
-            summary = parts[0].replace("Summary:", "").strip()
-            actions = [ln.strip("- ").strip() for ln in parts[1].splitlines() if ln.strip().startswith("-")]
-        return GroqSummaryResponse(summary=summary, key_actions=actions[:6], model="assistant")
-    except GroqError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    text = await safe_groq_chat_completion(
+        system_prompt=system,
+        user_prompt=user,
+        model=DEFAULT_MODEL,
+        temperature=0.3,
+        max_tokens=350,
+        use_cache=True
+    )
+    # Very simple parse
+    summary = text
+    actions: list[str] = []
+    if "Actions:" in text:
+        parts = text.split("Actions:", 1)
+        summary = parts[0].replace("Summary:", "").strip()
+        actions = [ln.strip("- ").strip() for ln in parts[1].splitlines() if ln.strip().startswith("-")]
+    return GroqSummaryResponse(summary=summary, key_actions=actions[:6], model="assistant")
 
 
 @app.post("/ai/campaign-idea", response_model=GroqCampaignIdeaResponse)
@@ -709,25 +839,22 @@ async def generate_ai_campaign(request: GroqCampaignIdeaRequest):
         "Title: ...\n"
         "Description: ...\n"
     )
-    try:
-        text = await groq_chat_completion(
-            system_prompt=system,
-            user_prompt=user,
-            model=DEFAULT_MODEL,
-            temperature=0.5,
-            max_tokens=220,
-            use_cache=True
-        )
-        title = "Campaign Idea"
-        desc = text.strip()
-        for line in text.splitlines():
-            if line.lower().startswith("title:"):
-                title = line.split(":", 1)[1].strip() or title
-            if line.lower().startswith("description:"):
-                desc = line.split(":", 1)[1].strip() or desc
-        return GroqCampaignIdeaResponse(title=title, description=desc, model="assistant")
-    except GroqError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    text = await safe_groq_chat_completion(
+        system_prompt=system,
+        user_prompt=user,
+        model=DEFAULT_MODEL,
+        temperature=0.5,
+        max_tokens=220,
+        use_cache=True
+    )
+    title = "Campaign Idea"
+    desc = text.strip()
+    for line in text.splitlines():
+        if line.lower().startswith("title:"):
+            title = line.split(":", 1)[1].strip() or title
+        if line.lower().startswith("description:"):
+            desc = line.split(":", 1)[1].strip() or desc
+    return GroqCampaignIdeaResponse(title=title, description=desc, model="assistant")
 
 
 @app.post("/ai/chat", response_model=AiChatResponse)
@@ -739,16 +866,14 @@ async def ai_chat(request: AiChatRequest):
     # Import chat_handler functions
     try:
         from chat_handler import (
-            parse_date_range, filter_reviews_by_date, compute_stats_from_reviews,
-            extract_topics_from_reviews, format_response_template,
+            parse_date_range, date_range_span_days, review_frame_for, detect_intents, Intent, HISTORY_RE,
+            CHAT_RESPONSE_CACHE, chat_cache_key, reviews_fingerprint, format_response_template,
             generate_screenshot_guidance, generate_export_guidance,
-            build_evidence_quotes
+            CHAT_SYSTEM_PROMPT, CHAT_USER_TEMPLATE
         )
     except Exception as e:
         # If import fails, use simple fallback
-        import traceback
-        error_msg = f"Chat handler import error: {str(e)}\n{traceback.format_exc()}"
-        print(error_msg)  # Log for debugging
+        logger.exception("Chat handler import error: %s", e)
         
         # Return a simple response that still works
         analysis = request.analysis or {}
@@ -767,106 +892,131 @@ async def ai_chat(request: AiChatRequest):
     try:
         ql = q.lower()
         
-        # Get raw reviews data (safe handling)
+        # Get raw reviews data
         # Prefer request.reviews; if too few, optionally fetch from Shopify/Judge.me directly
-        raw_reviews = getattr(request, 'reviews', None) or []
-        if not isinstance(raw_reviews, list):
-            raw_reviews = []
+        # (AiChatRequest validation এর পর reviews list, shopify ShopifyRequest, date_range DateRange)
+        raw_reviews = request.reviews or []
 
-        # Optional server-side fetch (avoids frontend cache/limit). Uses ShopifyRequest-like payload.
-        shop = getattr(request, "shopify", None)
-        try:
-            shop_dict = shop.model_dump() if hasattr(shop, "model_dump") else (shop or None)
-        except Exception:
-            shop_dict = None
+        # Optional server-side fetch (avoids frontend cache/limit)
+        shop = request.shopify
+        store_domain = shop.store_domain if shop is not None else None
 
-        if (not raw_reviews or len(raw_reviews) < 100) and isinstance(shop_dict, dict):
-            try:
-                review_app_token = shop_dict.get("review_app_token") or os.getenv("JUDGE_ME_API_TOKEN")
-                fetched = await fetch_shopify_reviews_with_metadata(
-                    store_domain=shop_dict.get("store_domain") or "",
-                    access_token=shop_dict.get("access_token") or "",
-                    limit=int(shop_dict.get("limit") or 10000),
-                    review_app=shop_dict.get("review_app") or "judge_me",
-                    review_app_token=review_app_token
-                )
-                if isinstance(fetched, list) and fetched:
-                    raw_reviews = fetched
-                    print(f"[AI Chat] Server-side fetched reviews: {len(raw_reviews)}")
-            except Exception as e:
-                print(f"[AI Chat] Server-side fetch failed: {e}")
-        
-        # Debug: Log how many reviews we received
-        print(f"[AI Chat] Received {len(raw_reviews)} reviews from frontend")
-        
         # Parse date range from question or use provided
         parsed_range = None
         try:
-            parsed_range = parse_date_range(q)
-            if parsed_range:
-                print(f"[AI Chat] Parsed date range from question: {parsed_range}")
+            parsed = parse_date_range(q)
+            if parsed:
+                parsed_range = DateRange.model_validate(parsed)
+                logger.debug("Parsed date range from question: %s", parsed_range)
         except Exception as e:
-            print(f"Date range parsing error: {e}")
+            logger.warning("Date range parsing error: %s", e)
         
         used_range = parsed_range or request.date_range
         if used_range:
-            print(f"[AI Chat] Using date range: {used_range}")
+            logger.debug("Using date range: %s", used_range)
         
-        # If user asked for a long historical range but we have few reviews, try server-side fetch
-        if isinstance(shop_dict, dict):
-            try:
-                wants_history = bool(re.search(r"\b20(2[0-9])\b|থেকে|theke|porjonto|পর্যন্ত", q, re.IGNORECASE))
-            except Exception:
-                wants_history = False
+        # Debug: Log how many reviews we received
+        logger.debug("Received %d reviews from frontend", len(raw_reviews))
+
+        # Server-side fetch একবারই করছি - কম reviews থাকলে, অথবা long historical range
+        # চাইলে কিন্তু হাতে 1000 এর কম থাকলে। দুই ক্ষেত্রেই একই target limit।
+        wants_history = HISTORY_RE.search(q) is not None
+        span_days = date_range_span_days(used_range)
+        wants_more = wants_history or (span_days is not None and span_days > 90)
 
+        too_few = len(raw_reviews) < 100
+        if shop is not None and (too_few or (wants_more and len(raw_reviews) < 1000)):
             try:
-                span_days = None
-                if isinstance(used_range, dict) and used_range.get("start") and used_range.get("end"):
-                    d0 = datetime.strptime(str(used_range["start"]), "%Y-%m-%d")
-                    d1 = datetime.strptime(str(used_range["end"]), "%Y-%m-%d")
-                    span_days = abs((d1 - d0).days)
-            except Exception:
-                span_days = None
-
-            if (wants_history or (span_days is not None and span_days > 90)) and len(raw_reviews) < 1000:
-                try:
-                    review_app_token = shop_dict.get("review_app_token") or os.getenv("JUDGE_ME_API_TOKEN")
-                    fetched = await fetch_shopify_reviews_with_metadata(
-                        store_domain=shop_dict.get("store_domain") or "",
-                        access_token=shop_dict.get("access_token") or "",
-                        limit=int(shop_dict.get("limit") or 10000),
-                        review_app=shop_dict.get("review_app") or "judge_me",
-                        review_app_token=review_app_token
-                    )
-                    if isinstance(fetched, list) and fetched and len(fetched) > len(raw_reviews):
-                        raw_reviews = fetched
-                        print(f"[AI Chat] Server-side fetched more reviews: {len(raw_reviews)}")
-                except Exception as e:
-                    print(f"[AI Chat] History fetch failed: {e}")
+                fetched = await fetch_shopify_reviews_with_metadata(
+                    store_domain=shop.store_domain,
+                    access_token=shop.access_token,
+                    limit=shop.limit or 10000,
+                    review_app=shop.review_app or "judge_me",
+                    review_app_token=shop.review_app_token or JUDGE_ME_API_TOKEN_ENV
+                )
+                if isinstance(fetched, list) and fetched and (too_few or len(fetched) > len(raw_reviews)):
+                    raw_reviews = fetched
+                    logger.debug("Server-side fetched reviews: %d", len(raw_reviews))
+            except Exception as e:
+                logger.warning("Server-side fetch failed: %s", e)
+
+        # Same question on the same data হলে cached answer দিচ্ছি (history থাকলে না)
+        # Stream request এ cache নেই - cached body application/json, stream client text/event-stream চায়
+        # Key এ server-side fetch এর পরের reviews এর content digest - আলাদা data (বা
+        # store_domain ছাড়া অন্য client) কখনো একই answer পায় না। Digest না বানানো গেলে cache নেই
+        # Digest একবারই - answer cache আর ReviewFrame cache দুটোই এটা ব্যবহার করে
+        reviews_digest = reviews_fingerprint(raw_reviews)
+        cache_key = None
+        if not request.history and not request.stream and reviews_digest is not None:
+            cache_key = chat_cache_key(
+                store_domain=store_domain,
+                date_range=used_range,
+                date_range_label=request.date_range_label,
+                product_id=request.product_id,
+                ql=ql,
+                reviews_digest=reviews_digest,
+                # Prompt এ product_analytics এর শুধু count যায়
+                product_count=len(request.product_analytics or [])
+            )
+            cached = CHAT_RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
+
+        # used_filters দুই রকম: শুধু date range, অথবা date range + product (একবারই বানাচ্ছি)
+        range_json = used_range.model_dump(mode="json") if used_range else None
+        date_filters = {"date_range": range_json} if used_range else None
+        used_filters = {"date_range": range_json, "product_id": request.product_id} if (used_range or request.product_id) else None
+
+        def respond(
+            answer: str,
+            suggested_actions: Optional[list[str]] = None,
+            with_product: bool = False
+        ) -> ORJSONResponse:
+            # Model টা এখানেই validate হচ্ছে, তাই FastAPI এর response_model
+            # re-validate/encode pass skip করে সরাসরি orjson bytes পাঠাচ্ছি
+            response = ORJSONResponse(AiChatResponse(
+                answer=answer,
+                model="assistant",
+                suggested_actions=suggested_actions,
+                used_filters=used_filters if with_product else date_filters
+            ).model_dump())
+            if cache_key is not None:
+                CHAT_RESPONSE_CACHE.put(cache_key, response.body)
+            return response
 
         # Filter reviews by date range and product
-        filtered_reviews = raw_reviews
+        # ReviewFrame একবার বানিয়ে সব filter/stats numpy array এর উপর চালাচ্ছি (একই reviews এ পরের turn cached frame পায়)
+        frame = review_frame_for(raw_reviews, store_domain, reviews_digest)
+        idx = frame.all_indices()
         try:
-            if used_range and isinstance(used_range, dict):
-                before_count = len(filtered_reviews)
-                filtered_reviews = filter_reviews_by_date(filtered_reviews, used_range)
-                after_count = len(filtered_reviews)
-                print(f"[AI Chat] Filtered reviews: {before_count} -> {after_count} (date range: {used_range})")
+            if used_range:
+                before_count = len(idx)
+                idx = frame.filter_by_date(idx, used_range)
+                logger.debug("Filtered reviews: %d -> %d (date range: %s)", before_count, len(idx), used_range)
         except Exception as e:
-            print(f"Date filtering error: {e}")
+            logger.warning("Date filtering error: %s", e)
             # Continue with unfiltered reviews
         
         if request.product_id:
             try:
-                filtered_reviews = [r for r in filtered_reviews if r and str(r.get("product_id", "")) == str(request.product_id)]
+                idx = frame.filter_by_product(idx, request.product_id)
             except Exception as e:
-                print(f"Product filtering error: {e}")
+                logger.warning("Product filtering error: %s", e)
+
         
+        # Stats, topics আর evidence একে অপরের উপর depend করে না - thread pool এ একসাথে চালাচ্ছি
+        # যাতে CPU কাজের সময় event loop block না হয় (numba kernels GIL ছেড়ে দেয়)
+        stats, negative_topics, positive_topics, evidence_quotes = await asyncio.gather(
+            asyncio.to_thread(frame.stats, idx),
+            asyncio.to_thread(frame.topics, idx, "negative", 5),
+            asyncio.to_thread(frame.topics, idx, "positive", 5),
+            asyncio.to_thread(frame.evidence_quotes, q, idx, 3),
+            return_exceptions=True
+        )
+
         # Compute stats from filtered reviews (real data, no hallucination)
-        try:
-            stats = compute_stats_from_reviews(filtered_reviews)
-        except Exception as e:
-            print(f"Stats computation error: {e}")
+        if isinstance(stats, Exception):
+            logger.warning("Stats computation error: %s", stats)
             stats = {
                 "total": 0,
                 "positive_count": 0,
@@ -876,94 +1026,73 @@ async def ai_chat(request: AiChatRequest):
                 "negative_pct": 0.0,
                 "neutral_pct": 0.0,
                 "avg_rating": None,
+                "rated_count": 0,
             }
         
         # Extract topics
-        try:
-            negative_topics = extract_topics_from_reviews(filtered_reviews, "negative", 5)
-            positive_topics = extract_topics_from_reviews(filtered_reviews, "positive", 5)
-        except Exception as e:
-            print(f"Topic extraction error: {e}")
+        if isinstance(negative_topics, Exception) or isinstance(positive_topics, Exception):
+            error = negative_topics if isinstance(negative_topics, Exception) else positive_topics
+            logger.warning("Topic extraction error: %s", error)
             negative_topics = []
             positive_topics = []
         
         # Evidence quotes (grounded, max 3 quotes, max 12 words each)
-        evidence_quotes = []
-        try:
-            evidence_quotes = build_evidence_quotes(q, filtered_reviews, max_quotes=3)
-        except Exception as e:
-            print(f"Evidence retrieval error: {e}")
+        if isinstance(evidence_quotes, Exception):
+            logger.warning("Evidence retrieval error: %s", evidence_quotes)
             evidence_quotes = []
 
         # Handle specific user intents
+        # সব intent keyword একবারের scan এ detect করছি - result একটা Intent bitmask
+        intents = detect_intents(ql)
         
         # 1) Screenshot/Report UI guidance
-        if any(k in ql for k in ["screenshot", "ui generate", "report layout", "ki show korbo"]):
+        if intents & Intent.SCREENSHOT:
             topics_dict = {"negative": negative_topics, "positive": positive_topics}
             guidance = generate_screenshot_guidance(stats, topics_dict)
-            return AiChatResponse(
-                answer=guidance,
-                model="assistant",
+            return respond(
+                guidance,
                 suggested_actions=["Capture screenshot", "Share with team"],
-                used_filters={"date_range": used_range, "product_id": request.product_id} if (used_range or request.product_id) else None
+                with_product=True
             )
         
         # 2) Export guidance
-        if any(k in ql for k in ["export", "csv", "download", "export kivabe"]):
+        if intents & Intent.EXPORT:
             guidance = generate_export_guidance()
-            return AiChatResponse(
-                answer=guidance,
-                model="assistant",
-                suggested_actions=["Click Export CSV", "Verify date range"],
-                used_filters={"date_range": used_range} if used_range else None
+            return respond(
+                guidance,
+                suggested_actions=["Click Export CSV", "Verify date range"]
             )
         
         # 3) Quick stats
-        if any(k in ql for k in ["total", "koyta", "how many", "koto"]):
-            if any(k in ql for k in ["negative", "neg", "kharap"]):
+        if intents & Intent.STATS:
+            if intents & Intent.STATS_NEGATIVE:
                 answer = f"Negative reviews: {stats['negative_count']} ({stats['negative_pct']}%)."
                 if negative_topics:
                     top_issue = negative_topics[0]
                     answer += f" Top issue: '{top_issue[0]}' ({top_issue[1]} mentions)."
-                return AiChatResponse(
-                    answer=answer,
-                    model="assistant",
-                    suggested_actions=["Check top negative topics", "Review product page"] if stats['total'] > 0 else None,
-                    used_filters={"date_range": used_range} if used_range else None
+                return respond(
+                    answer,
+                    suggested_actions=["Check top negative topics", "Review product page"] if stats['total'] > 0 else None
                 )
             
-            if any(k in ql for k in ["positive", "pos", "valo", "bhalo"]):
+            if intents & Intent.STATS_POSITIVE:
                 answer = f"Positive reviews: {stats['positive_count']} ({stats['positive_pct']}%)."
                 if positive_topics:
                     top_praise = positive_topics[0]
                     answer += f" Top praise: '{top_praise[0]}' ({top_praise[1]} mentions)."
-                return AiChatResponse(
-                    answer=answer,
-                    model="assistant",
-                    suggested_actions=["Highlight in marketing", "Feature in product page"] if stats['total'] > 0 else None,
-                    used_filters={"date_range": used_range} if used_range else None
+                return respond(
+                    answer,
+                    suggested_actions=["Highlight in marketing", "Feature in product page"] if stats['total'] > 0 else None
                 )
             
-            if "neutral" in ql:
-                return AiChatResponse(
-                    answer=f"Neutral reviews: {stats['neutral_count']} ({stats['neutral_pct']}%).",
-                    model="assistant",
-                    used_filters={"date_range": used_range} if used_range else None
-                )
+            if intents & Intent.STATS_NEUTRAL:
+                return respond(f"Neutral reviews: {stats['neutral_count']} ({stats['neutral_pct']}%).")
             
-            if any(k in ql for k in ["rating", "average", "avg"]):
+            if intents & Intent.STATS_RATING:
                 if stats['avg_rating']:
-                    return AiChatResponse(
-                        answer=f"Average rating: {stats['avg_rating']}/5.0 (from {len([r for r in filtered_reviews if r.get('rating')])} rated reviews).",
-                        model="assistant",
-                        used_filters={"date_range": used_range} if used_range else None
-                    )
+                    return respond(f"Average rating: {stats['avg_rating']}/5.0 (from {stats['rated_count']} rated reviews).")
                 else:
-                    return AiChatResponse(
-                        answer="Rating data not available. Reviews may not have ratings.",
-                        model="assistant",
-                        used_filters={"date_range": used_range} if used_range else None
-                    )
+                    return respond("Rating data not available. Reviews may not have ratings.")
             
             # Total reviews
             answer = format_response_template(
@@ -976,33 +1105,20 @@ async def ai_chat(request: AiChatRequest):
                 insight=f"In the selected range, {stats['positive_pct']}% are positive and {stats['negative_pct']}% are negative.",
                 next_actions=["Check top negative topics to reduce returns", "Highlight positive feedback in marketing"]
             )
-            return AiChatResponse(
-                answer=answer,
-                model="assistant",
-                used_filters={"date_range": used_range} if used_range else None
-            )
+            return respond(answer)
         
         # 4) Topics & Pain Points
-        if any(k in ql for k in ["topic", "issue", "problem", "pain", "complaint", "praise"]):
-            if any(k in ql for k in ["negative", "issue", "problem", "complaint", "kharap"]):
+        if intents & Intent.TOPICS:
+            if intents & Intent.TOPICS_NEGATIVE:
                 if not negative_topics:
-                    return AiChatResponse(
-                        answer="No negative issues found in the selected range. Great news!",
-                        model="assistant",
-                        used_filters={"date_range": used_range} if used_range else None
-                    )
+                    return respond("No negative issues found in the selected range. Great news!")
                 
                 top_issues = negative_topics[:3]
                 issue_list = [f"'{t[0]}' ({t[1]} mentions)" for t in top_issues]
                 
                 # Get example review for top issue
-                evidence = []
                 top_issue_keyword = top_issues[0][0]
-                for r in filtered_reviews[:5]:
-                    body = (r.get("body") or r.get("text") or "").lower()
-                    if top_issue_keyword in body and len(evidence) < 2:
-                        text = (r.get("body") or r.get("text") or "")[:60]
-                        evidence.append(text)
+                evidence = [frame.bodies[i][:60] for i in frame.find_keyword(idx[:5], top_issue_keyword, limit=2)]
                 
                 answer = format_response_template(
                     key_numbers=[f"Top negative issues: {', '.join(issue_list)}"],
@@ -1014,20 +1130,14 @@ async def ai_chat(request: AiChatRequest):
                     ],
                     evidence=evidence
                 )
-                return AiChatResponse(
-                    answer=answer,
-                    model="assistant",
-                    suggested_actions=[f"Fix {top_issues[0][0]} issue", "Update product listing"],
-                    used_filters={"date_range": used_range} if used_range else None
+                return respond(
+                    answer,
+                    suggested_actions=[f"Fix {top_issues[0][0]} issue", "Update product listing"]
                 )
             
-            if any(k in ql for k in ["positive", "praise", "good", "valo"]):
+            if intents & Intent.TOPICS_POSITIVE:
                 if not positive_topics:
-                    return AiChatResponse(
-                        answer="No specific positive topics identified in the selected range.",
-                        model="assistant",
-                        used_filters={"date_range": used_range} if used_range else None
-                    )
+                    return respond("No specific positive topics identified in the selected range.")
                 
                 top_praises = positive_topics[:3]
                 praise_list = [f"'{t[0]}' ({t[1]} mentions)" for t in top_praises]
@@ -1041,25 +1151,22 @@ async def ai_chat(request: AiChatRequest):
                         "Add to product highlights"
                     ]
                 )
-                return AiChatResponse(
-                    answer=answer,
-                    model="assistant",
-                    suggested_actions=["Create marketing campaign", "Update product page"],
-                    used_filters={"date_range": used_range} if used_range else None
+                return respond(
+                    answer,
+                    suggested_actions=["Create marketing campaign", "Update product page"]
                 )
         
         # 5) Product-specific queries
-        if request.product_id and any(k in ql for k in ["product", "item", "this product"]):
-            product_reviews = [r for r in filtered_reviews if str(r.get("product_id", "")) == str(request.product_id)]
-            if not product_reviews:
-                return AiChatResponse(
-                    answer="No reviews found for this product in the selected range.",
-                    model="assistant",
-                    used_filters={"date_range": used_range, "product_id": request.product_id} if (used_range or request.product_id) else None
+        if request.product_id and intents & Intent.PRODUCT:
+            # Frame এর product codes থেকেই - reviews আবার dict ধরে scan করতে হয় না
+            if frame.filter_by_product(idx, request.product_id).size == 0:
+                return respond(
+                    "No reviews found for this product in the selected range.",
+                    with_product=True
                 )
         
         # 6) Recommendations
-        if any(k in ql for k in ["recommend", "suggest", "improve", "fix", "what should", "ki kora"]):
+        if intents & Intent.RECOMMEND:
             actions = []
             if negative_topics:
                 top_issue = negative_topics[0]
@@ -1075,68 +1182,29 @@ async def ai_chat(request: AiChatRequest):
                 insight="Focus on addressing negative issues first, then amplify positive feedback.",
                 next_actions=actions
             )
-            return AiChatResponse(
-                answer=answer,
-                model="assistant",
-                suggested_actions=actions[:3] if actions else None,
-                used_filters={"date_range": used_range} if used_range else None
+            return respond(
+                answer,
+                suggested_actions=actions[:3] if actions else None
             )
         
         # Default: Use LLM with grounded data
-        system = (
-            "You are an AI assistant helping users understand their review data.\n\n"
-            "CRITICAL RULES:\n"
-            "1. NEVER guess or hallucinate numbers, dates, or percentages.\n"
-            "2. Use ONLY the provided statistics and data.\n"
-            "3. If data is missing, say: 'I don't have that data yet. Please connect a data source or upload reviews.'\n"
-            "4. Always cite numbers from the provided stats.\n"
-            "5. When computing, show brief formula (e.g., 'Positive % = positive_count / total_reviews').\n\n"
-            "Response format:\n"
-            "- Keep responses clean, short, and structured\n"
-            "- ALWAYS start with: Answer:\n"
-            "- Then bullet key numbers\n"
-            "- Then: Insight:\n"
-            "- Then: Next actions:\n"
-            "- If quoting reviews: max 12 words per quote, max 3 quotes\n"
-            "- Use bullets for key numbers\n"
-            "- Provide 1-2 sentence insights\n"
-            "- List actionable next steps\n"
-            "- For deep analysis, include 2-3 example review snippets\n\n"
-            "Privacy: Never reveal emails or personal info. Mask emails as a***@b.com if present.\n\n"
-            "Supported intents:\n"
-            "- Quick stats (total, positive/negative counts)\n"
-            "- Breakdowns by date range, product, rating\n"
-            "- Topics & pain points\n"
-            "- Business recommendations\n"
-            "- Export/CSV guidance\n"
-            "- Screenshot/report UI guidance\n"
-        )
-        
         # Build context with real data
-        dr_label = request.date_range_label or (f"{used_range['start']} to {used_range['end']}" if used_range and isinstance(used_range, dict) else "selected range")
+        dr_label = request.date_range_label or (f"{used_range.start} to {used_range.end}" if used_range else "selected range")
         
-        user_context = (
-            f"Structured data (use ONLY this - never guess):\n"
-            f"- date_range: {dr_label}\n"
-            f"- total_reviews: {stats['total']}\n"
-            f"- positive_count: {stats['positive_count']}\n"
-            f"- negative_count: {stats['negative_count']}\n"
-            f"- neutral_count: {stats['neutral_count']}\n"
-            f"- positive_percentage: {stats['positive_pct']}\n"
-            f"- negative_percentage: {stats['negative_pct']}\n"
-            f"- neutral_percentage: {stats['neutral_pct']}\n"
-            f"- average_rating: {stats['avg_rating'] or 'N/A'}\n"
-            f"- top_negative_topics: {[(t[0], t[1]) for t in negative_topics[:5]]}\n"
-            f"- top_positive_topics: {[(t[0], t[1]) for t in positive_topics[:5]]}\n"
-            f"- evidence_quotes: {evidence_quotes}\n"
-            f"- sample_reviews_count: {len(filtered_reviews[:5])}\n"
-            f"- product_analytics: {len(request.product_analytics or [])} products\n\n"
-            f"User question: {q}\n\n"
-            f"IMPORTANT: If the user asks about something not in the data above, say 'I don't have that data yet' and explain how to get it."
-        )
+        user_context = CHAT_USER_TEMPLATE.format_map({
+            **stats,
+            "avg_rating": stats["avg_rating"] or "N/A",
+            "dr_label": dr_label,
+            "top_negative_topics": list(map(_topic_pair, negative_topics[:5])),
+            "top_positive_topics": list(map(_topic_pair, positive_topics[:5])),
+            "evidence_quotes": evidence_quotes,
+            "sample_count": min(len(idx), 5),
+            "product_count": len(request.product_analytics or []),
+            "question": q,
+        })
         
         try:
-            messages = [{"role": "system", "content": system}]
+            messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
             for m in (request.history or [])[-10:]:
                 role = (m or {}).get("role")
                 content = (m or {}).get("content")
@@ -1147,8 +1215,42 @@ async def ai_chat(request: AiChatRequest):
                 messages.append({"role": role, "content": content.strip()[:1200]})
             messages.append({"role": "user", "content": user_context})
             
-            text = await groq_chat_completion(
-                system_prompt=system,
+            if request.stream:
+                # Filters আগেই পাঠাচ্ছি, তারপর Groq token আসার সাথে সাথে forward করছি
+                # Streamed answer cache হয় না (stream request এ cache_key সবসময় None)
+                async def generate():
+                    yield sse_event({"used_filters": used_filters}, event="filters")
+                    sent_any = False
+                    try:
+                        async for delta in groq_chat_completion_stream(
+                            messages=messages,
+                            model=DEFAULT_MODEL,
+                            temperature=0.2,
+                            max_tokens=500
+                        ):
+                            sent_any = True
+                            yield sse_event({"delta": delta})
+                    except GroqError as e:
+                        logger.warning("Groq stream failed: %s", e)
+                        if sent_any:
+                            yield sse_event({"detail": str(e)}, event="error")
+                    if not sent_any:
+                        # কিছুই আসেনি - deterministic answer পাঠাচ্ছি
+                        yield sse_event({"delta": format_response_template(
+                            key_numbers=[
+                                f"Total: {stats['total']}",
+                                f"Positive: {stats['positive_count']} ({stats['positive_pct']}%)",
+                                f"Negative: {stats['negative_count']} ({stats['negative_pct']}%)"
+                            ],
+                            insight="Ask about specific topics, issues, or recommendations.",
+                            next_actions=["Check top negative topics", "Review positive feedback"]
+                        )})
+                    yield sse_event({"model": "assistant"}, event="done")
+
+                return StreamingResponse(generate(), media_type="text/event-stream")
+
+            text = await safe_groq_chat_completion(
+                system_prompt=CHAT_SYSTEM_PROMPT,
                 user_prompt=user_context,
                 messages=messages,
                 model=DEFAULT_MODEL,
@@ -1156,10 +1258,9 @@ async def ai_chat(request: AiChatRequest):
                 max_tokens=500,
                 use_cache=True
             )
-            return AiChatResponse(
-                answer=text.strip(),
-                model="assistant",
-                used_filters={"date_range": used_range, "product_id": request.product_id} if (used_range or request.product_id) else None
+            return respond(
+                text.strip(),
+                with_product=True
             )
         except Exception as llm_error:
             # Fallback to deterministic answer
@@ -1175,7 +1276,7 @@ async def ai_chat(request: AiChatRequest):
                         next_actions=["Check top negative topics", "Review positive feedback"]
                     ),
                     model="assistant",
-                    used_filters={"date_range": used_range} if used_range else None
+                    used_filters=date_filters
                 )
             except Exception as fallback_error:
                 # Ultimate fallback
@@ -1185,9 +1286,7 @@ async def ai_chat(request: AiChatRequest):
                 )
     except Exception as e:
         # Catch any unexpected errors
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"AI Chat Error: {error_trace}")
+        logger.exception("AI Chat Error: %s", e)
         
         # Return a helpful error message
         return AiChatResponse(
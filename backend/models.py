@@ -4,14 +4,24 @@
 # array operations, calculations এর জন্য দরকার
 import numpy as np
 
+# Topic counting (numba না থাকলে)
+from collections import Counter
+from operator import itemgetter
+
 # utils.py থেকে helper functions import করছি
-# extract_words = text থেকে meaningful words বের করে (stop words বাদ দিয়ে)
-from utils import extract_words
+# clean_text_ascii = clean_text এর bytes version, STOP_WORDS = বাদ দেওয়ার common words
+from utils import clean_text_ascii, STOP_WORDS
+
+# numba (optional) থাকলে topic counting JIT kernel এ হয়, না থাকলে Counter এ
+from topic_counter_numba import NUMBA_AVAILABLE, stop_word_hashes
+if NUMBA_AVAILABLE:
+    from topic_counter_numba import count_words
 
-# TfidfVectorizer: Text কে numbers এ convert করে (vectors)
-# TF-IDF = Term Frequency - Inverse Document Frequency
+# HashingVectorizer: Text কে numbers এ convert করে (vectors) - word এর hash ই column index,
+# তাই vocabulary dict lookup লাগে না
+# TfidfTransformer: TF-IDF = Term Frequency - Inverse Document Frequency
 # যে word বেশি আসে কিন্তু সব document এ না, সেটা important
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 
 # LogisticRegression: Simple কিন্তু effective classification algorithm
 # Binary classification এর জন্য perfect (positive vs negative)
@@ -21,12 +31,23 @@ from sklearn.linear_model import LogisticRegression
 # Model কতটা ভালো কাজ করছে সেটা check করতে
 from sklearn.model_selection import train_test_split
 
-# Counter: কোন item কতবার আছে সেটা count করে
-# Topic extraction এ keyword frequency বের করতে ব্যবহার করব
-from collections import Counter
-
 # typing: Type hints এর জন্য - code readable করে
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Trained model disk এ save/load করার জন্য
+# joblib sklearn এর সাথেই install হয়
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import sklearn
 
 
 # ============ TRAINING DATA ============
@@ -73,6 +94,52 @@ NEGATIVE_REVIEWS = [
 ]
 
 
+# Trained model এখানে save হয়, পরের start এ আর train করতে হয় না
+MODEL_PATH = Path(__file__).parent / "sent_model.joblib"
+
+# SentimentAnalyzer এর per-text prediction cache এ সর্বোচ্চ কতগুলো review থাকবে
+PREDICTION_CACHE_SIZE = 50_000
+
+# Model load/save/train এর খবর - main.py এর LOG_LEVEL logging config এ যায়
+logger = logging.getLogger(__name__)
+
+
+# ============ PREDICTION RESULTS ============
+# Sentiment code -> label (PredictionBatch.sent এর index)
+SENTIMENT_LABELS = ("negative", "positive")
+
+
+@dataclass
+class PredictionBatch:
+    """
+    predict() এর result - প্রতিটা review এর জন্য dict না বানিয়ে তিনটা parallel column
+    texts[i], sent[i] (uint8: 1 = positive, 0 = negative), conf[i] (3 decimal rounded)
+    Dict list শুধু API response বানানোর সময় to_dicts() দিয়ে লাগে
+    """
+    texts: List[str]
+    sent: np.ndarray
+    conf: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def labels(self) -> List[str]:
+        """
+        প্রতিটা review এর "positive"/"negative" label (TopicExtractor এর input)
+        """
+        return [SENTIMENT_LABELS[s] for s in self.sent.tolist()]
+    
+    def to_dicts(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        প্রথম limit টা (None হলে সব) row কে আগের মতো
+        {"text", "sentiment", "confidence"} dict এ convert করে
+        """
+        return [
+            {"text": text, "sentiment": SENTIMENT_LABELS[s], "confidence": c}
+            for text, s, c in zip(self.texts[:limit], self.sent[:limit].tolist(), self.conf[:limit].tolist())
+        ]
+
+
 # ============ SENTIMENT ANALYZER CLASS ============
 # এই class টা মূল AI/ML logic handle করে
 # Text নিয়ে predict করে সেটা positive না negative
@@ -89,17 +156,24 @@ class SentimentAnalyzer:
         Model initialize এবং train করে
         """
         
-        # TfidfVectorizer তৈরি করছি
-        # max_features=1000: সবচেয়ে important 1000 টা word রাখবে
+        # HashingVectorizer তৈরি করছি - শুধু raw term counts দেয়, IDF আলাদা transformer এ
+        # n_features=2**18: hash buckets - training vocabulary (কয়েকশো term) এর তুলনায় অনেক বড়,
+        #   তাই unknown word এর hash কোনো trained term এর সাথে মিলে যাওয়ার chance খুব কম
         # stop_words='english': common words বাদ দেবে (the, is, a, etc.)
         # ngram_range=(1,2): single words + 2-word combinations দেখবে
         #   যেমন: "good" এবং "very good" দুটোই consider করবে
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+        # alternate_sign=False, norm=None: plain counts - TF-IDF weighting/normalize পরে হবে
+        self.vectorizer = HashingVectorizer(
+            n_features=2 ** 18,
             stop_words='english',
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None
         )
         
+        # TfidfTransformer: training counts থেকে IDF শেখে, তারপর L2 normalize করে
+        self.tfidf = TfidfTransformer()
+        
         # LogisticRegression classifier তৈরি করছি
         # max_iter=500: maximum 500 বার try করবে optimal solution খুঁজতে
         # random_state=42: reproducibility এর জন্য - প্রতিবার same result আসবে
@@ -111,8 +185,90 @@ class SentimentAnalyzer:
         # Model train হয়েছে কিনা track করার জন্য
         self.is_trained = False
         
-        # Model টা train করে ফেলছি
-        self._train_model()
+        # Review text -> (sentiment code, confidence) LRU cache
+        # Copy-paste complaint বা canned praise বারবার আসলে আবার score করতে হয় না
+        # Sync endpoints threadpool এ চলে, তাই OrderedDict এর access lock এর ভেতরে
+        self._prediction_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # আগে save করা model থাকলে সেটা load করছি, না হলে train করে save করছি
+        if not self._load_model():
+            self._train_model()
+            self._save_model()
+    
+    def _model_fingerprint(self) -> str:
+        """
+        Training data + model settings + sklearn version এর hash
+        এগুলোর কোনোটা বদলালে saved model আর valid না - আবার train হবে
+        """
+        raw = repr((
+            POSITIVE_REVIEWS,
+            NEGATIVE_REVIEWS,
+            sorted(self.vectorizer.get_params().items()),
+            sorted(self.tfidf.get_params().items()),
+            sorted(self.classifier.get_params().items()),
+            sklearn.__version__,
+        )).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+    
+    def _load_model(self) -> bool:
+        """
+        MODEL_PATH থেকে (fingerprint, vectorizer, tfidf, classifier) load করে
+        File না থাকলে, পুরনো হলে বা পড়া না গেলে False
+        """
+        if not MODEL_PATH.exists():
+            return False
+        try:
+            fingerprint, vectorizer, tfidf, classifier = joblib.load(MODEL_PATH)
+        except Exception as e:
+            logger.warning("Saved model could not be loaded, retraining: %s", e)
+            return False
+        if fingerprint != self._model_fingerprint():
+            return False
+        
+        self.vectorizer = vectorizer
+        self.tfidf = tfidf
+        self.classifier = classifier
+        self._cache_weights()
+        self.is_trained = True
+        logger.info("Model loaded from %s", MODEL_PATH.name)
+        return True
+    
+    def _save_model(self):
+        """
+        Trained model MODEL_PATH এ save করে
+        Read-only filesystem হলে শুধু skip করে - server চলতে থাকবে
+
+        আগে process-specific temp file এ লিখে তারপর os.replace করছি, যাতে একসাথে
+        start হওয়া অন্য worker process কখনো অর্ধেক লেখা file পড়ে আবার train না করে
+        """
+        tmp_path = MODEL_PATH.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            joblib.dump(
+                (self._model_fingerprint(), self.vectorizer, self.tfidf, self.classifier),
+                tmp_path,
+                compress=3,
+            )
+            os.replace(tmp_path, MODEL_PATH)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning("Could not save model to %s: %s", MODEL_PATH, e)
+    
+    def _cache_weights(self):
+        """
+        Training এর পর IDF আর LR weights fixed, তাই একসাথে গুণ করে রাখছি
+        score = (counts · (idf * coef)) / ||counts * idf|| + intercept
+        এতে predict এর সময় আলাদা TF-IDF matrix বানাতে হয় না
+        """
+        # float32: inference এ শুধু এই দুইটা vector gather হয়, half bytes যথেষ্ট precision
+        # (sum গুলো np.bincount এ float64 এ হয়)। Saved model float64 ই থাকে।
+        self._idf = self.tfidf.idf_.astype(np.float32)
+        self._weights = (self.tfidf.idf_ * self.classifier.coef_.ravel()).astype(np.float32)
+        self._intercept = float(self.classifier.intercept_[0])
+        
+        # Weights বদলেছে (train/load) - আগের cached predictions আর valid না
+        with self._cache_lock:
+            self._prediction_cache.clear()
     
     def _train_model(self):
         """
@@ -130,8 +286,15 @@ class SentimentAnalyzer:
         labels = [1] * len(POSITIVE_REVIEWS) + [0] * len(NEGATIVE_REVIEWS)
         
         # Text কে TF-IDF vectors এ convert করছি
-        # fit_transform: প্রথমে vocabulary শেখে, তারপর convert করে
-        X = self.vectorizer.fit_transform(all_reviews)
+        # HashingVectorizer stateless - কিছু শিখতে হয় না, শুধু counts
+        # tfidf.fit_transform: প্রথমে IDF শেখে, তারপর convert করে
+        counts = self.vectorizer.transform(all_reviews)
+        X = self.tfidf.fit_transform(counts)
+        
+        # Training এ কখনো দেখা যায়নি এমন bucket এর IDF 0 করে দিচ্ছি
+        # আগের vocabulary এর মতোই unknown words score বা norm কোনোটাতেই গোনা হবে না
+        seen = np.bincount(counts.indices, minlength=counts.shape[1]) > 0
+        self.tfidf.idf_ = np.where(seen, self.tfidf.idf_, 0.0)
         
         # Labels কে numpy array এ convert করছি
         y = np.array(labels)
@@ -140,13 +303,38 @@ class SentimentAnalyzer:
         # X = features (TF-IDF vectors), y = labels (0 or 1)
         self.classifier.fit(X, y)
         
+        # Predict এর জন্য combined weights
+        self._cache_weights()
+        
         # Training complete হয়েছে mark করছি
         self.is_trained = True
         
-        # Console এ জানাচ্ছি training হয়ে গেছে
-        print(f"Model trained with {len(all_reviews)} reviews")
+        # Log এ জানাচ্ছি training হয়ে গেছে
+        logger.info("Model trained with %d reviews", len(all_reviews))
     
-    def predict(self, reviews: List[str]) -> List[Dict]:
+    def _scores(self, reviews: List[str]) -> np.ndarray:
+        """
+        প্রতিটা review এর LogisticRegression decision score (float64 array)
+        """
+        
+        # সব reviews একবারেই raw term count matrix এ convert করছি
+        # HashingVectorizer (norm=None) = hashed column এ শুধু counts, IDF/normalize নিচে হয়
+        X = self.vectorizer.transform(reviews)
+        
+        # Binary LogisticRegression এর decision score, TF-IDF matrix না বানিয়েই:
+        # প্রতিটা nonzero count একবার দেখে numerator (counts · weights) আর
+        # TF-IDF row এর L2 norm দুটোই row-wise sum করছি
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        numerators = np.bincount(rows, weights=X.data * self._weights[X.indices], minlength=X.shape[0])
+        # X এই call এরই নিজের matrix, তাই TF-IDF value আর তার square X.data তেই in-place
+        # করছি - আলাদা TF-IDF copy বা squared copy allocate হয় না
+        X.data *= self._idf[X.indices]
+        np.square(X.data, out=X.data)
+        norms = np.sqrt(np.bincount(rows, weights=X.data, minlength=X.shape[0]))
+        # কোনো known word না থাকলে (সব bucket এর idf 0) row টা zero - তখন score শুধু intercept
+        return np.divide(numerators, norms, out=np.zeros(X.shape[0]), where=norms > 0) + self._intercept
+    
+    def predict(self, reviews: List[str]) -> PredictionBatch:
         """
         নতুন reviews এর sentiment predict করে
         
@@ -154,52 +342,73 @@ class SentimentAnalyzer:
             reviews: List of review texts to analyze
             
         Returns:
-            List of dicts with 'sentiment' and 'confidence' for each review
+            PredictionBatch - প্রতিটা review এর sentiment code আর confidence
         """
         
         # Model train না হলে error
         if not self.is_trained:
             raise ValueError("Model is not trained yet!")
         
-        # Results store করার জন্য empty list
-        results = []
+        # Empty input হলে sklearn 0-row array এ error দেয়
+        if not reviews:
+            return PredictionBatch([], np.zeros(0, np.uint8), np.zeros(0))
         
-        # প্রতিটা review এর জন্য prediction করব
-        for review in reviews:
-            # Single review কে TF-IDF vector এ convert করছি
-            # transform (not fit_transform): আগে শেখা vocabulary ব্যবহার করছি
-            X = self.vectorizer.transform([review])
-            
-            # Prediction করছি (0 or 1)
-            prediction = self.classifier.predict(X)[0]
-            
-            # Probability বের করছি (কতটা confident)
-            # predict_proba returns [prob_class_0, prob_class_1]
-            probabilities = self.classifier.predict_proba(X)[0]
-            
-            # যে class predict করেছি তার probability নিচ্ছি
-            # এটাই confidence score
-            confidence = float(max(probabilities))
-            
-            # Sentiment string এ convert করছি
-            sentiment = "positive" if prediction == 1 else "negative"
+        # আগে predict করা text cache থেকে নিচ্ছি, বাকিগুলো (misses) শুধু একবার করে score হবে
+        sent = np.empty(len(reviews), np.uint8)
+        conf = np.empty(len(reviews))
+        miss_slots: Dict[str, int] = {}
+        miss_rows: List[int] = []
+        row_slots: List[int] = []
+        with self._cache_lock:
+            cache = self._prediction_cache
+            for i, review in enumerate(reviews):
+                hit = cache.get(review)
+                if hit is None:
+                    miss_rows.append(i)
+                    row_slots.append(miss_slots.setdefault(review, len(miss_slots)))
+                else:
+                    cache.move_to_end(review)
+                    sent[i], conf[i] = hit
+        
+        if miss_slots:
+            miss_texts = list(miss_slots)
+            miss_sent, miss_conf = self._predict_uncached(miss_texts)
+            sent[miss_rows] = miss_sent[row_slots]
+            conf[miss_rows] = miss_conf[row_slots]
             
-            # Result add করছি
-            results.append({
-                "text": review,
-                "sentiment": sentiment,
-                "confidence": round(confidence, 3)  # 3 decimal places
-            })
-        
-        return results
+            with self._cache_lock:
+                cache = self._prediction_cache
+                cache.update(zip(miss_texts, zip(miss_sent.tolist(), miss_conf.tolist())))
+                while len(cache) > PREDICTION_CACHE_SIZE:
+                    cache.popitem(last=False)
+        
+        return PredictionBatch(list(reviews), sent, conf)
+    
+    def _predict_uncached(self, reviews: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cache ছাড়া reviews score করে (sentiment codes, rounded confidences) return করে
+        """
+        scores = self._scores(reviews)
+        
+        # score > 0 মানে positive (classifier.predict এর মতোই, 0 হলে negative)
+        # predict_proba = sigmoid(score), তাই predicted class এর probability = sigmoid(|score|)
+        # এটাই confidence score
+        predictions = scores > 0
+        confidences = 1.0 / (1.0 + np.exp(-np.abs(scores)))
+        
+        # round() Python float এ করছি যাতে আগের মতো একই 3 decimal value আসে
+        # (np.round half-to-even না, binary representation এ কাজ করে - কিছু value আলাদা হয়)
+        # conf float64 রাখছি: float32 এ রাখলে response এ 0.56 এর জায়গায় 0.5600000023841858 আসত
+        rounded = np.fromiter((round(c, 3) for c in confidences.tolist()), np.float64, len(reviews))
+        return predictions.astype(np.uint8), rounded
     
-    def get_prediction_summary(self, predictions: List[Dict]) -> Dict:
+    def get_prediction_summary(self, predictions: PredictionBatch) -> Dict:
         """
         সব predictions এর summary তৈরি করে
         Counts, percentages বের করে
         
         Args:
-            predictions: List of prediction results from predict()
+            predictions: PredictionBatch from predict()
             
         Returns:
             Dict with counts and percentages
@@ -219,7 +428,8 @@ class SentimentAnalyzer:
             }
         
         # Positive কতগুলো count করছি
-        positive_count = sum(1 for p in predictions if p["sentiment"] == "positive")
+        # sent এ positive = 1, তাই sum ই positive count
+        positive_count = int(predictions.sent.sum(dtype=np.int64))
         
         # Negative = total - positive
         negative_count = total - positive_count
@@ -249,6 +459,66 @@ class TopicExtractor:
     Note: STOP_WORDS এবং clean_text এখন utils.py তে আছে
     """
     
+    # Stop words bytes এ - topic counting পুরোটা clean_text_ascii এর bytes এ হয়,
+    # শুধু top K word str এ decode হয়
+    _STOP_BYTES = frozenset(w.encode("ascii") for w in STOP_WORDS)
+    
+    # numba kernel এর জন্য stop words এর sorted FNV hashes
+    _STOP_HASHES = stop_word_hashes(STOP_WORDS)
+    
+    @staticmethod
+    def _top_topics_numba(buf: bytes, top_k: int) -> List[Tuple[str, int]]:
+        """
+        _top_topics এর numba version - kernel একবারে পুরো buffer
+        tokenize + stop word filter + count করে
+        """
+        data = np.frombuffer(buf, dtype=np.uint8)
+        counts, firsts, lengths = count_words(data, TopicExtractor._STOP_HASHES, 3)
+        
+        k = min(top_k, counts.size)
+        if k == 0:
+            return []
+        
+        # পুরো vocabulary sort না করে k-th সবচেয়ে বড় count পর্যন্ত candidates (tie সহ) নিচ্ছি
+        threshold = np.partition(counts, counts.size - k)[counts.size - k]
+        candidates = np.flatnonzero(counts >= threshold)
+        
+        # বেশি count আগে, tie হলে buffer এ যেটা আগে এসেছে (Counter.most_common এর মতো)
+        order = candidates[np.lexsort((firsts[candidates], -counts[candidates]))][:top_k]
+        return [
+            (buf[firsts[c]:firsts[c] + lengths[c]].decode("ascii"), int(counts[c]))
+            for c in order.tolist()
+        ]
+    
+    @staticmethod
+    def _top_topics(texts: List[str], top_k: int) -> List[Tuple[str, int]]:
+        """
+        Texts এর words count করে top K (word, count) return করে
+        Words: clean_text এর পর 3+ letter, STOP_WORDS বাদ (extract_words এর মতো)
+        Counter.most_common এর মতোই order: বেশি count আগে, tie হলে যেটা আগে এসেছে
+        """
+        if not texts or top_k <= 0:
+            return []
+        
+        # সব review একটা bytes buffer এ - শুধু a-z আর whitespace থাকে
+        buf = b" ".join(map(clean_text_ascii, texts))
+        
+        if NUMBA_AVAILABLE:
+            return TopicExtractor._top_topics_numba(buf, top_k)
+        
+        # bytes.split + Counter দুটোই C তে চলে; stop word/ছোট word count এর পরে বাদ দিচ্ছি
+        # (Counter insertion order = প্রথম দেখা order, filter করলেও বাকিদের order একই থাকে)
+        stop_bytes = TopicExtractor._STOP_BYTES
+        words = [
+            (word, count)
+            for word, count in Counter(buf.split()).items()
+            if len(word) >= 3 and word not in stop_bytes
+        ]
+        
+        # sort stable - একই count হলে আগে দেখা word আগে থাকে
+        words.sort(key=itemgetter(1), reverse=True)
+        return [(word.decode("ascii"), count) for word, count in words[:top_k]]
+    
     @staticmethod
     def extract_topics(
         reviews: List[str],
@@ -269,48 +539,37 @@ class TopicExtractor:
         """
         
         # Positive এবং negative reviews আলাদা করছি
-        positive_words = []
-        negative_words = []
-        
-        # প্রতিটা review process করছি
-        for review, sentiment in zip(reviews, sentiments):
-            # utils.py এর extract_words ব্যবহার করছি
-            # এটা automatically clean করে, stop words বাদ দেয়
-            meaningful_words = extract_words(review, remove_stopwords=True, min_length=3)
-            
-            # Sentiment অনুযায়ী সঠিক list এ add করছি
-            if sentiment == "positive":
-                positive_words.extend(meaningful_words)
-            else:
-                negative_words.extend(meaningful_words)
-        
-        # Word frequency count করছি
-        positive_counts = Counter(positive_words)
-        negative_counts = Counter(negative_words)
+        # ("positive" ছাড়া বাকি সব negative side এ যায়)
+        positive_reviews = [review for review, sentiment in zip(reviews, sentiments) if sentiment == "positive"]
+        negative_reviews = [review for review, sentiment in zip(reviews, sentiments) if sentiment != "positive"]
         
         # Top K topics বের করছি
-        # most_common(k) returns [(word, count), ...] format এ
+        # _top_topics returns [(word, count), ...] format এ
         top_positive = [
             {"topic": word, "count": count, "sentiment": "positive"}
-            for word, count in positive_counts.most_common(top_k)
+            for word, count in TopicExtractor._top_topics(positive_reviews, top_k)
         ]
         
         top_negative = [
             {"topic": word, "count": count, "sentiment": "negative"}
-            for word, count in negative_counts.most_common(top_k)
+            for word, count in TopicExtractor._top_topics(negative_reviews, top_k)
         ]
         
         return top_positive, top_negative
 
 
 # ============ GLOBAL INSTANCE ============
-# Application start হওয়ার সময় একবার model load হবে
-# এরপর সব requests এই instance ব্যবহার করবে
+# প্রথম বার get_analyzer() call হলে model load/train হবে
+# এরপর সব requests এই একই instance ব্যবহার করবে
 # এটাকে "singleton pattern" বলে
+# Import এর সময় কিছু হয় না, তাই import fast আর process start block হয় না
 
-# SentimentAnalyzer এর global instance
-# এটা import করলেই trained model পাওয়া যাবে
-analyzer = SentimentAnalyzer()
+@lru_cache(maxsize=1)
+def get_analyzer() -> SentimentAnalyzer:
+    """
+    Shared SentimentAnalyzer instance return করে (প্রথম call এ তৈরি হয়)
+    """
+    return SentimentAnalyzer()
 
 # TopicExtractor এর instance দরকার নেই কারণ সব methods static/class methods
 # সরাসরি TopicExtractor.extract_topics() call করলেই হবে
@@ -1,15 +1,25 @@
 # pydantic হলো data validation library - এটা দিয়ে আমরা API এর input/output structure define করি
 # BaseModel inherit করলে automatic validation হয়, wrong data আসলে error দেয়
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError, constr, field_validator, model_validator
 
 # List ব্যবহার করব multiple items রাখতে (যেমন অনেকগুলো review)
 # Optional মানে এই field না দিলেও চলবে
 from typing import List, Optional
 
+# DateRange এর start/end
+from datetime import date
+
 
 # ============ REQUEST SCHEMAS ============
 # User যখন API তে request পাঠাবে, তখন এই format এ data আসবে
 
+# Request size limits - এর বেশি হলে model পর্যন্ত যাওয়ার আগেই 422 error
+# (একটা request এ বিশাল list/string দিয়ে memory spike করা যাবে না)
+MAX_REVIEWS_PER_REQUEST = 5000
+MAX_REVIEW_LENGTH = 4096
+# Shopify fetch limit - frontend form এর max আর /ai/chat এর fetch target এর সমান
+MAX_SHOPIFY_FETCH_LIMIT = 10000
+
 class ReviewRequest(BaseModel):
     """
     User এর কাছ থেকে আসা request এর structure
@@ -19,7 +29,9 @@ class ReviewRequest(BaseModel):
     # reviews: List[str] মানে এটা একটা list যেখানে string থাকবে
     # উদাহরণ: ["This product is great", "Bad quality", "Love it"]
     # এটা required field - না দিলে error হবে
-    reviews: List[str]
+    # প্রতিটা review max MAX_REVIEW_LENGTH characters, list এ max MAX_REVIEWS_PER_REQUEST টা
+    # (empty list এর check endpoint এ - সেখানে আগের মতো 400 error message দেয়)
+    reviews: List[constr(max_length=MAX_REVIEW_LENGTH)] = Field(max_length=MAX_REVIEWS_PER_REQUEST)
     
     # Optional[str] মানে এটা string হতে পারে অথবা None হতে পারে
     # = None মানে default value হলো None, মানে user না দিলেও চলবে
@@ -47,9 +59,9 @@ class ShopifyRequest(BaseModel):
     # Permissions needed: read_products, read_content
     access_token: str
     
-    # Maximum reviews to fetch (default 500)
+    # Maximum reviews to fetch (default 500, 1 থেকে MAX_SHOPIFY_FETCH_LIMIT)
     # বেশি দিলে API call বেশি সময় নিবে
-    limit: Optional[int] = 500
+    limit: Optional[int] = Field(default=500, ge=1, le=MAX_SHOPIFY_FETCH_LIMIT)
     
     # ========== OPTIONAL: Third-party review app ==========
     # যদি Judge.me, Loox, Yotpo ইত্যাদি ব্যবহার করো
@@ -272,6 +284,22 @@ class GroqCampaignIdeaResponse(BaseModel):
 
 # ============ AI CHAT (DEEP DIVE) SCHEMAS ============
 
+class DateRange(BaseModel):
+    """
+    Inclusive date range - frontend {start: "YYYY-MM-DD", end: "YYYY-MM-DD"} পাঠায়।
+    Request এ ঢোকার সময়ই validate হয়, তাই chat handler এ আর type check লাগে না।
+    """
+    start: date
+    end: date
+
+    @model_validator(mode="after")
+    def _check_order(self) -> "DateRange":
+        # Reversed range দিলে filter চুপচাপ 0 reviews দিত - তাই এখানেই reject
+        if self.start > self.end:
+            raise ValueError("date_range start must not be after end")
+        return self
+
+
 class AiChatRequest(BaseModel):
     """
     Dashboard "View Deep Dive" chatbox এর জন্য request।
@@ -280,7 +308,7 @@ class AiChatRequest(BaseModel):
     question: str
     date_range_label: Optional[str] = None
     # Date range for filtering (if provided)
-    date_range: Optional[dict] = None  # {start: "YYYY-MM-DD", end: "YYYY-MM-DD"}
+    date_range: Optional[DateRange] = None  # {start: "YYYY-MM-DD", end: "YYYY-MM-DD"}
     # AnalysisResponse shape (subset) - frontend computed metrics
     analysis: Optional[dict] = None
     # Raw reviews data for filtering and analysis
@@ -296,6 +324,18 @@ class AiChatRequest(BaseModel):
     product_analytics: Optional[List[dict]] = None
     # Optional product_id for product-specific queries
     product_id: Optional[str] = None
+    # True হলে LLM answer text/event-stream (SSE) হিসেবে token by token আসবে
+    stream: bool = False
+
+    @field_validator("date_range", mode="wrap")
+    @classmethod
+    def _ignore_bad_date_range(cls, value, handler):
+        # Partial/malformed/reversed range ({} বা শুধু start) এর জন্য পুরো chat 422 হবে না -
+        # আগের মতো range টা ignore করে সব reviews নিয়ে উত্তর দেয়
+        try:
+            return handler(value)
+        except ValidationError:
+            return None
 
 
 class AiChatResponse(BaseModel):
@@ -0,0 +1,6 @@
+# Backend modules flat imports ব্যবহার করে (from utils import ...), তাই backend/ কে path এ রাখছি
+# যাতে যেকোনো directory থেকে test চালানো যায়
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
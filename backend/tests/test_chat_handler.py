@@ -0,0 +1,345 @@
+"""
+chat_handler.ReviewFrame vs the original per-dict filters/stats/topics, plus the
+chat answer cache, review fingerprints and the no-pyahocorasick fallback.
+"""
+
+import random
+import re
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from dateutil import parser as date_parser
+
+import chat_handler
+import fast_stats
+from chat_handler import (
+    ChatResponseCache,
+    Intent,
+    INTENT_KEYWORDS,
+    ReviewFrame,
+    TOPIC_KEYWORDS,
+    chat_cache_key,
+    detect_intents,
+    review_frame_for,
+    reviews_fingerprint,
+)
+from schemas import DateRange
+
+
+# ============ REFERENCE (original per-dict implementations) ============
+
+def ref_filter_by_date(reviews, date_range):
+    start = datetime.strptime(date_range["start"], "%Y-%m-%d")
+    end = datetime.strptime(date_range["end"], "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+    filtered = []
+    for r in reviews:
+        created_at = r.get("created_at")
+        if not created_at:
+            continue
+        try:
+            if start <= date_parser.parse(created_at) <= end:
+                filtered.append(r)
+        except Exception:
+            continue
+    return filtered
+
+
+def ref_filter_by_product(reviews, product_id):
+    return [r for r in reviews if r and str(r.get("product_id", "")) == str(product_id)]
+
+
+def ref_stats(reviews):
+    total = len(reviews)
+    positive = negative = neutral = 0
+    ratings = []
+    for r in reviews:
+        rating = r.get("rating")
+        if isinstance(rating, (int, float)) and 1 <= rating <= 5:
+            ratings.append(rating)
+            if rating >= 4:
+                positive += 1
+            elif rating <= 2:
+                negative += 1
+            else:
+                neutral += 1
+        else:
+            sentiment = (r.get("sentiment_label") or r.get("sentiment") or "").lower()
+            if sentiment == "positive":
+                positive += 1
+            elif sentiment == "negative":
+                negative += 1
+            else:
+                neutral += 1
+    avg_rating = sum(ratings) / len(ratings) if ratings else None
+    return {
+        "total": total,
+        "positive_count": positive,
+        "negative_count": negative,
+        "neutral_count": neutral,
+        "positive_pct": round((positive / total * 100) if total > 0 else 0, 1),
+        "negative_pct": round((negative / total * 100) if total > 0 else 0, 1),
+        "neutral_pct": round((neutral / total * 100) if total > 0 else 0, 1),
+        "avg_rating": round(avg_rating, 2) if avg_rating else None,
+        "rated_count": len(ratings),
+    }
+
+
+def ref_topics(reviews, sentiment="negative", top_k=5):
+    keyword_counts = {}
+    for r in reviews:
+        body = (r.get("body") or r.get("text") or "").lower()
+        rating = r.get("rating")
+        label = (r.get("sentiment_label") or r.get("sentiment") or "").lower()
+        if sentiment == "negative":
+            if not ((rating and rating <= 2) or label == "negative"):
+                continue
+        elif sentiment == "positive":
+            if not ((rating and rating >= 4) or label == "positive"):
+                continue
+        for kw in TOPIC_KEYWORDS:
+            if kw in body:
+                keyword_counts[kw] = keyword_counts.get(kw, 0) + 1
+    return sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+
+def ref_relevant(question, reviews, k=8):
+    q = re.sub(r"[^a-z0-9\s]", " ", (question or "").lower())
+    q_terms = [w for w in q.split() if len(w) >= 3]
+    if not q_terms:
+        return reviews[:k]
+    scored = []
+    for r in reviews:
+        body = (r.get("body") or r.get("text") or "").lower()
+        prod = (r.get("product_title") or "").lower()
+        score = sum(2 for t in q_terms if t in body) + sum(1 for t in q_terms if t in prod)
+        if score > 0:
+            scored.append((score, r))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    top = [r for _, r in scored[:k]]
+    if len(top) < k:
+        top.extend([r for r in reviews if r not in top][: (k - len(top))])
+    return top[:k]
+
+
+_WORDS = ("battery", "charging", "size", "fit", "shipping", "customer service", "price", "cheap",
+          "great", "broke", "quality", "Color", "DESIGN", "arrived late", "love", "mail@example.com")
+
+
+def random_reviews(n, seed=0):
+    rng = random.Random(seed)
+    day0 = date(2023, 1, 1)
+    reviews = []
+    for i in range(n):
+        day = day0 + timedelta(days=rng.randint(0, 1000))
+        created = rng.choice([
+            day.isoformat(), day.isoformat(), f"{day.isoformat()}T{rng.randint(0, 23):02d}:15:00",
+            None, "", "garbage",
+        ])
+        r = {
+            "id": i,
+            "rating": rng.choice([None, 1, 2, 3, 4, 5, 3.5, 0, 6, 4.0]),
+            "sentiment_label": rng.choice([None, "positive", "Negative", "neutral", ""]),
+            "created_at": created,
+            "product_id": rng.choice([None, 1, 2, "2", "abc"]),
+            "product_title": rng.choice(["Phone Case", "Battery Pack", None]),
+        }
+        text = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(0, 6)))
+        field = rng.choice(["body", "body", "text", None])
+        if field:
+            r[field] = text
+        if rng.random() < 0.1:
+            del r["product_id"]
+        reviews.append(r)
+    return reviews
+
+
+def random_ranges(n, seed=0):
+    rng = random.Random(seed)
+    ranges = []
+    for _ in range(n):
+        start = date(2022, 12, 1) + timedelta(days=rng.randint(0, 1100))
+        end = start + timedelta(days=rng.choice([0, 1, 7, 30, 400]))
+        ranges.append({"start": start.isoformat(), "end": end.isoformat()})
+    return ranges
+
+
+# ============ REVIEW FRAME ============
+
+class ReviewFrameTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reviews = random_reviews(3000)
+        cls.frame = ReviewFrame.from_reviews(cls.reviews)
+
+    def test_filter_by_date_matches_reference(self):
+        idx = self.frame.all_indices()
+        for dr in random_ranges(50):
+            got = self.frame.take(self.frame.filter_by_date(idx, DateRange.model_validate(dr)))
+            self.assertEqual(got, ref_filter_by_date(self.reviews, dr), dr)
+        self.assertIs(self.frame.filter_by_date(idx, None), idx)
+
+    def test_filter_reviews_by_date_matches_reference(self):
+        for dr in random_ranges(10, seed=1):
+            self.assertEqual(chat_handler.filter_reviews_by_date(self.reviews, dr), ref_filter_by_date(self.reviews, dr))
+        # Partial range আগের মতো ignore; reversed range ও এখন ignore (আগে সব review বাদ পড়ত)
+        self.assertEqual(chat_handler.filter_reviews_by_date(self.reviews, {"start": "2024-01-01"}), self.reviews)
+        reversed_range = {"start": "2024-02-01", "end": "2024-01-01"}
+        self.assertEqual(chat_handler.filter_reviews_by_date(self.reviews, reversed_range), self.reviews)
+
+    def test_filter_by_product_matches_reference(self):
+        idx = self.frame.all_indices()
+        for product_id in ("1", 1, "2", 2, "abc", "None", "missing"):
+            got = self.frame.take(self.frame.filter_by_product(idx, product_id))
+            self.assertEqual(got, ref_filter_by_product(self.reviews, product_id), product_id)
+        self.assertIs(self.frame.filter_by_product(idx, None), idx)
+
+    def test_stats_match_reference(self):
+        idx = self.frame.all_indices()
+        for dr in random_ranges(20, seed=2):
+            sub = self.frame.filter_by_date(idx, DateRange.model_validate(dr))
+            expected = ref_stats(self.frame.take(sub)) if sub.size else chat_handler._empty_stats()
+            self.assertEqual(self.frame.stats(sub), expected, dr)
+            with mock.patch.object(fast_stats, "NUMBA_AVAILABLE", False):
+                self.assertEqual(self.frame.stats(sub), expected, dr)
+        self.assertEqual(chat_handler.compute_stats_from_reviews(self.reviews), ref_stats(self.reviews))
+        self.assertEqual(chat_handler.compute_stats_from_reviews([]), chat_handler._empty_stats())
+
+    def check_topics(self):
+        idx = self.frame.all_indices()
+        for sentiment in ("negative", "positive", "all"):
+            for top_k in (5, 30):
+                self.assertEqual(
+                    self.frame.topics(idx, sentiment, top_k), ref_topics(self.reviews, sentiment, top_k),
+                    (sentiment, top_k),
+                )
+
+    def test_topics_match_reference(self):
+        self.check_topics()
+
+    def test_topics_without_ahocorasick(self):
+        with mock.patch.object(chat_handler, "HAS_AHOCORASICK", False):
+            self.check_topics()
+
+    def test_relevant_reviews_match_reference(self):
+        for question in ("battery charging?", "phone case quality", "hi", "", "What about SHIPPING price"):
+            for k in (3, 8):
+                self.assertEqual(
+                    chat_handler.retrieve_relevant_reviews(question, self.reviews, k),
+                    ref_relevant(question, self.reviews, k),
+                    (question, k),
+                )
+
+    def test_evidence_quotes_mask_emails(self):
+        quotes = chat_handler.build_evidence_quotes("mail", [{"body": "write to mail@example.com please"}])
+        self.assertEqual(quotes, ["write to m***@example.com please"])
+
+
+class IntentTests(unittest.TestCase):
+
+    QUESTIONS = (
+        "how many negative reviews?", "top complaint issue", "export csv", "screenshot please",
+        "valo review koto", "average rating of this product", "what should we improve", "hello",
+    )
+
+    def ref_intents(self, ql):
+        mask = Intent.NONE
+        for intent, keywords in INTENT_KEYWORDS.items():
+            if any(kw in ql for kw in keywords):
+                mask |= intent
+        return mask
+
+    def test_detect_intents_matches_reference(self):
+        for q in self.QUESTIONS:
+            self.assertEqual(detect_intents(q), self.ref_intents(q), q)
+            with mock.patch.object(chat_handler, "HAS_AHOCORASICK", False):
+                self.assertEqual(detect_intents(q), self.ref_intents(q), q)
+
+
+# ============ CACHES ============
+
+class ChatResponseCacheTests(unittest.TestCase):
+
+    def test_ttl_expiry(self):
+        cache = ChatResponseCache(maxsize=4, ttl=10.0)
+        with mock.patch.object(chat_handler.time, "monotonic", return_value=100.0):
+            cache.put(("k",), "answer")
+        with mock.patch.object(chat_handler.time, "monotonic", return_value=109.0):
+            self.assertEqual(cache.get(("k",)), "answer")
+        with mock.patch.object(chat_handler.time, "monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(("k",)))
+        self.assertNotIn(("k",), cache._data)
+
+    def test_lru_eviction(self):
+        cache = ChatResponseCache(maxsize=2, ttl=60.0)
+        cache.put(("a",), 1)
+        cache.put(("b",), 2)
+        self.assertEqual(cache.get(("a",)), 1)  # a এখন সবচেয়ে recent
+        cache.put(("c",), 3)
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual((cache.get(("a",)), cache.get(("c",))), (1, 3))
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(chat_handler, "REVIEW_FRAME_CACHE", ChatResponseCache(maxsize=16, ttl=300.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reviews = random_reviews(50, seed=5)
+
+    def test_fingerprint_tracks_content(self):
+        digest = reviews_fingerprint(self.reviews)
+        self.assertEqual(reviews_fingerprint([dict(r) for r in self.reviews]), digest)
+        for field, value in (("body", "changed"), ("rating", 4.5), ("created_at", "2020-01-01"), ("product_id", "zzz")):
+            changed = [dict(r) for r in self.reviews]
+            changed[7][field] = value
+            self.assertNotEqual(reviews_fingerprint(changed), digest, field)
+        # Extra field যা ReviewFrame পড়ে না - fingerprint একই
+        extra = [dict(r, reviewer_name="x") for r in self.reviews]
+        self.assertEqual(reviews_fingerprint(extra), digest)
+        self.assertIsNone(reviews_fingerprint([]))
+        self.assertIsNone(reviews_fingerprint(self.reviews + ["not a dict"]))
+
+    def test_review_frame_cached_per_store_and_content(self):
+        frame = review_frame_for(self.reviews, "shop.example")
+        self.assertIs(review_frame_for([dict(r) for r in self.reviews], "shop.example"), frame)
+        self.assertIsNot(review_frame_for(self.reviews, "other.example"), frame)
+        # একই ids, আলাদা body - পুরনো frame ফেরত দেওয়া যাবে না
+        changed = [dict(r, body="different") for r in self.reviews]
+        changed_frame = review_frame_for(changed, "shop.example")
+        self.assertIsNot(changed_frame, frame)
+        self.assertEqual(changed_frame.bodies.tolist(), ["different"] * len(changed))
+
+    def test_review_frame_not_cached_without_store(self):
+        self.assertIsNot(review_frame_for(self.reviews), review_frame_for(self.reviews))
+        self.assertFalse(chat_handler.REVIEW_FRAME_CACHE._data)
+
+    def test_chat_cache_key(self):
+        dr = DateRange(start="2024-01-01", end="2024-01-31")
+        digest = reviews_fingerprint(self.reviews)
+        key = chat_cache_key("shop.example", dr, None, None, "how  many   reviews", digest, 0)
+        self.assertEqual(key, chat_cache_key("shop.example", dr, None, None, "how many reviews", digest, 0))
+        other = reviews_fingerprint([dict(r, rating=5) for r in self.reviews])
+        self.assertNotEqual(key, chat_cache_key("shop.example", dr, None, None, "how many reviews", other, 0))
+        self.assertNotEqual(key, chat_cache_key("shop.example", None, None, None, "how many reviews", digest, 0))
+
+
+class DateRangeSchemaTests(unittest.TestCase):
+
+    def test_reversed_range_rejected(self):
+        with self.assertRaises(ValueError):
+            DateRange(start="2024-02-01", end="2024-01-01")
+
+    def test_bad_chat_range_ignored(self):
+        from schemas import AiChatRequest
+        for value in ({}, {"start": "2024-01-01"}, {"start": "2024-02-01", "end": "2024-01-01"}, {"start": "x", "end": "y"}):
+            self.assertIsNone(AiChatRequest(question="q", date_range=value).date_range, value)
+        ok = AiChatRequest(question="q", date_range={"start": "2024-01-01", "end": "2024-01-31"}).date_range
+        self.assertEqual((ok.start, ok.end), (date(2024, 1, 1), date(2024, 1, 31)))
+        self.assertEqual(chat_handler.date_range_span_days(ok), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+numba kernels (fast_stats, topic_counter_numba) vs their numpy / Counter fallbacks.
+"""
+
+import unittest
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+
+import fast_stats
+import topic_counter_numba
+from utils import STOP_WORDS, clean_text_ascii
+from tests.test_utils import random_texts
+
+
+def random_columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sent = rng.integers(-1, 2, n).astype(np.int8)
+    rating = rng.choice([1, 2, 3, 4, 5, 3.5, np.nan], n).astype(np.float32)
+    return sent, rating
+
+
+def random_indices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        np.arange(n, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+        np.sort(rng.choice(n, n // 3, replace=False)).astype(np.int64),
+        rng.permutation(n).astype(np.int64)[: n // 2],
+    ]
+
+
+class StatsKernelTests(unittest.TestCase):
+
+    def test_sentiment_counts_match_fallback_and_bincount(self):
+        sent, _ = random_columns(5000)
+        for idx in random_indices(5000):
+            expected = tuple(int(c) for c in np.bincount(sent[idx] + 1, minlength=3))
+            self.assertEqual(fast_stats.sentiment_counts(sent, idx), expected)
+            with mock.patch.object(fast_stats, "NUMBA_AVAILABLE", False):
+                self.assertEqual(fast_stats.sentiment_counts(sent, idx), expected)
+
+    def test_rating_mean_count_matches_fallback(self):
+        _, rating = random_columns(5000, seed=1)
+        for idx in random_indices(5000, seed=1):
+            values = [float(v) for v in rating[idx] if not np.isnan(v)]
+            fast = fast_stats.rating_mean_count(rating, idx)
+            with mock.patch.object(fast_stats, "NUMBA_AVAILABLE", False):
+                fallback = fast_stats.rating_mean_count(rating, idx)
+            self.assertEqual(fast[1], len(values))
+            self.assertEqual(fallback[1], len(values))
+            if values:
+                self.assertAlmostEqual(fast[0], sum(values) / len(values), places=9)
+                self.assertAlmostEqual(fallback[0], sum(values) / len(values), places=9)
+            else:
+                self.assertEqual(fast, (None, 0))
+                self.assertEqual(fallback, (None, 0))
+
+    def test_all_missing_ratings(self):
+        rating = np.full(10, np.nan, dtype=np.float32)
+        self.assertEqual(fast_stats.rating_mean_count(rating, np.arange(10, dtype=np.int64)), (None, 0))
+
+
+@unittest.skipUnless(topic_counter_numba.NUMBA_AVAILABLE, "numba not installed")
+class CountWordsKernelTests(unittest.TestCase):
+
+    def test_count_words_matches_counter(self):
+        stop_hashes = topic_counter_numba.stop_word_hashes(STOP_WORDS)
+        stop_bytes = {w.encode("ascii") for w in STOP_WORDS}
+        buf = b" ".join(map(clean_text_ascii, random_texts(5000, seed=3)))
+        for min_length in (1, 3, 5):
+            counts, firsts, lengths = topic_counter_numba.count_words(
+                np.frombuffer(buf, dtype=np.uint8), stop_hashes, min_length
+            )
+            got = [(buf[f:f + n], int(c)) for c, f, n in zip(counts, firsts, lengths)]
+            # Counter insertion order = প্রথম দেখা order, kernel এর slot order ও তাই
+            expected = [
+                (word, count)
+                for word, count in Counter(buf.split()).items()
+                if len(word) >= min_length and word not in stop_bytes
+            ]
+            self.assertEqual(got, expected, min_length)
+
+    def test_fnv1a_matches_kernel_hash(self):
+        # Python fnv1a আর kernel এর hash এক না হলে stop word কখনো বাদ পড়বে না
+        stop_hashes = topic_counter_numba.stop_word_hashes(frozenset({"battery"}))
+        buf = np.frombuffer(b"battery screen battery", dtype=np.uint8)
+        counts, firsts, lengths = topic_counter_numba.count_words(buf, stop_hashes, 1)
+        self.assertEqual(counts.tolist(), [1])
+        self.assertEqual(bytes(buf[firsts[0]:firsts[0] + lengths[0]]), b"screen")
+
+    def test_empty_buffer(self):
+        counts, _, _ = topic_counter_numba.count_words(
+            np.zeros(0, dtype=np.uint8), topic_counter_numba.stop_word_hashes(STOP_WORDS), 3
+        )
+        self.assertEqual(counts.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+models.py vs the original TfidfVectorizer + LogisticRegression pipeline and the
+extract_words + Counter topic counting; plus prediction cache and saved-model fingerprint.
+"""
+
+import random
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.utils import murmurhash3_32
+
+import models
+from models import SentimentAnalyzer, TopicExtractor
+from tests.test_utils import ref_extract_words, random_texts
+
+
+# ============ REFERENCE (original implementations) ============
+
+class ReferenceAnalyzer:
+    """আগের SentimentAnalyzer - fitted vocabulary + predict/predict_proba"""
+
+    def __init__(self, positive, negative):
+        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 2))
+        self.classifier = LogisticRegression(max_iter=500, random_state=42)
+        X = self.vectorizer.fit_transform(positive + negative)
+        self.classifier.fit(X, np.array([1] * len(positive) + [0] * len(negative)))
+
+    def hash_collides(self, review, n_features):
+        """
+        review এর কোনো unknown n-gram কি trained term এর hash bucket এ পড়ে?
+        (HashingVectorizer এর মতোই bucket = |murmurhash3_32(term)| % n_features)
+        """
+        vocabulary = self.vectorizer.vocabulary_
+        trained = {abs(murmurhash3_32(term, seed=0)) % n_features for term in vocabulary}
+        return any(
+            abs(murmurhash3_32(term, seed=0)) % n_features in trained
+            for term in self.vectorizer.build_analyzer()(review)
+            if term not in vocabulary
+        )
+
+    def predict(self, reviews):
+        X = self.vectorizer.transform(reviews)
+        predictions = self.classifier.predict(X)
+        probabilities = self.classifier.predict_proba(X)
+        return [
+            {
+                "text": review,
+                "sentiment": "positive" if pred == 1 else "negative",
+                "confidence": round(float(max(proba)), 3),
+            }
+            for review, pred, proba in zip(reviews, predictions, probabilities)
+        ]
+
+
+def ref_top_topics(texts, top_k):
+    words = []
+    for text in texts:
+        words.extend(ref_extract_words(text, remove_stopwords=True, min_length=3))
+    return Counter(words).most_common(top_k)
+
+
+def review_texts(n, seed=0):
+    """Training vocabulary থেকে random review, সাথে কিছু unknown word"""
+    words = (" ".join(models.POSITIVE_REVIEWS + models.NEGATIVE_REVIEWS) + " zebra quux battery phone screen").split()
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 15))) for _ in range(n)]
+
+
+class AnalyzerTestCase(unittest.TestCase):
+    """প্রতিটা test এ MODEL_PATH একটা temp file - repo এর sent_model.joblib ছোঁয় না"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.model_path = Path(tmp.name) / "sent_model.joblib"
+        patcher = mock.patch.object(models, "MODEL_PATH", self.model_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+# ============ SCORING ============
+
+class ScoringEquivalenceTests(AnalyzerTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = ReferenceAnalyzer(models.POSITIVE_REVIEWS, models.NEGATIVE_REVIEWS)
+        cls.texts = review_texts(5000) + ["", "zebra quux", "!!!", "Great quality, highly recommend"]
+
+    def test_predictions_match_reference_pipeline(self):
+        # Hash এ term identity থাকে না - unknown n-gram কোনো trained term এর bucket এ পড়লে
+        # score আলাদা হতে পারে। শুধু সেই review গুলোই আলাদা হতে পারবে, বাকি সব exact একই
+        analyzer = SentimentAnalyzer()
+        n_features = analyzer.vectorizer.n_features
+        mismatches = [
+            text
+            for text, ours, theirs in zip(
+                self.texts, analyzer.predict(self.texts).to_dicts(), self.reference.predict(self.texts)
+            )
+            if ours != theirs
+        ]
+        for text in mismatches:
+            self.assertTrue(self.reference.hash_collides(text, n_features), text)
+        self.assertLess(len(mismatches), len(self.texts) // 100)
+
+    def test_predictions_match_without_collisions(self):
+        analyzer = SentimentAnalyzer()
+        n_features = analyzer.vectorizer.n_features
+        texts = [t for t in self.texts if not self.reference.hash_collides(t, n_features)]
+        self.assertEqual(analyzer.predict(texts).to_dicts(), self.reference.predict(texts))
+
+    def test_scores_match_decision_function(self):
+        analyzer = SentimentAnalyzer()
+        X = analyzer.tfidf.transform(analyzer.vectorizer.transform(self.texts))
+        np.testing.assert_allclose(
+            analyzer._scores(self.texts), analyzer.classifier.decision_function(X), rtol=1e-5, atol=1e-5
+        )
+
+    def test_unknown_words_score_as_intercept(self):
+        analyzer = SentimentAnalyzer()
+        scores = analyzer._scores(["zebra quux", ""])
+        np.testing.assert_allclose(scores, analyzer.classifier.intercept_[0])
+
+    def test_summary_matches_counts(self):
+        analyzer = SentimentAnalyzer()
+        predictions = analyzer.predict(self.texts)
+        summary = analyzer.get_prediction_summary(predictions)
+        labels = [d["sentiment"] for d in predictions.to_dicts()]
+        self.assertEqual(summary["positive_count"], labels.count("positive"))
+        self.assertEqual(summary["negative_count"], labels.count("negative"))
+        self.assertEqual(predictions.labels(), labels)
+
+
+# ============ PREDICTION CACHE ============
+
+class PredictionCacheTests(AnalyzerTestCase):
+
+    def test_cached_predictions_equal_uncached(self):
+        analyzer = SentimentAnalyzer()
+        texts = review_texts(500, seed=1)
+        first = analyzer.predict(texts).to_dicts()
+        with mock.patch.object(analyzer, "_predict_uncached", side_effect=AssertionError("cache miss")):
+            self.assertEqual(analyzer.predict(texts).to_dicts(), first)
+
+    def test_duplicates_scored_once(self):
+        analyzer = SentimentAnalyzer()
+        texts = ["Love it", "Bad product", "Love it", "", "Bad product", ""]
+        with mock.patch.object(analyzer, "_predict_uncached", wraps=analyzer._predict_uncached) as uncached:
+            batch = analyzer.predict(texts)
+        uncached.assert_called_once_with(["Love it", "Bad product", ""])
+        self.assertEqual(batch.texts, texts)
+        self.assertEqual(batch.to_dicts(), analyzer.predict(texts).to_dicts())
+
+    def test_lru_eviction(self):
+        analyzer = SentimentAnalyzer()
+        with mock.patch.object(models, "PREDICTION_CACHE_SIZE", 3):
+            analyzer.predict(["a b", "c d", "e f"])
+            analyzer.predict(["a b"])  # hit - সবচেয়ে recent এ যায়
+            analyzer.predict(["g h"])
+        self.assertEqual(list(analyzer._prediction_cache), ["e f", "a b", "g h"])
+
+    def test_retrain_clears_cache(self):
+        analyzer = SentimentAnalyzer()
+        analyzer.predict(["Great quality"])
+        self.assertTrue(analyzer._prediction_cache)
+        analyzer._train_model()
+        self.assertFalse(analyzer._prediction_cache)
+
+    def test_empty_input(self):
+        analyzer = SentimentAnalyzer()
+        self.assertEqual(len(analyzer.predict([])), 0)
+
+
+# ============ SAVED MODEL ============
+
+class PersistenceTests(AnalyzerTestCase):
+
+    def test_saved_model_is_loaded_without_training(self):
+        trained = SentimentAnalyzer()
+        self.assertTrue(self.model_path.exists())
+        texts = review_texts(300, seed=2)
+        with mock.patch.object(SentimentAnalyzer, "_train_model", side_effect=AssertionError("retrained")):
+            loaded = SentimentAnalyzer()
+        self.assertEqual(loaded.predict(texts).to_dicts(), trained.predict(texts).to_dicts())
+
+    def test_changed_fingerprint_retrains(self):
+        SentimentAnalyzer()
+        positive = models.POSITIVE_REVIEWS + ["Battery life is wonderful"]
+        with mock.patch.object(models, "POSITIVE_REVIEWS", positive):
+            with mock.patch.object(SentimentAnalyzer, "_train_model", autospec=True,
+                                   side_effect=SentimentAnalyzer._train_model) as train:
+                analyzer = SentimentAnalyzer()
+            train.assert_called_once()
+            texts = review_texts(300, seed=3) + ["wonderful battery life"]
+            reference = ReferenceAnalyzer(positive, models.NEGATIVE_REVIEWS)
+            self.assertEqual(analyzer.predict(texts).to_dicts(), reference.predict(texts))
+            # নতুন fingerprint সহ আবার save হয়েছে
+            fingerprint = joblib.load(self.model_path)[0]
+            self.assertEqual(fingerprint, analyzer._model_fingerprint())
+
+    def test_unreadable_model_retrains(self):
+        self.model_path.write_bytes(b"not a joblib file")
+        with self.assertLogs("models", "WARNING"):
+            analyzer = SentimentAnalyzer()
+        self.assertTrue(analyzer.is_trained)
+        self.assertEqual(joblib.load(self.model_path)[0], analyzer._model_fingerprint())
+
+
+# ============ TOPICS ============
+
+class TopicExtractorTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = random_texts(3000, seed=7) + review_texts(3000, seed=8)
+
+    def check_topics(self):
+        for top_k in (0, 1, 5, 50):
+            self.assertEqual(TopicExtractor._top_topics(self.texts, top_k), ref_top_topics(self.texts, top_k), top_k)
+        self.assertEqual(TopicExtractor._top_topics([], 5), [])
+
+    def test_topics_match_reference(self):
+        self.check_topics()
+
+    def test_counter_fallback_matches_reference(self):
+        with mock.patch.object(models, "NUMBA_AVAILABLE", False):
+            self.check_topics()
+
+    def test_extract_topics_splits_by_sentiment(self):
+        reviews = self.texts[:1000]
+        sentiments = [random.Random(i).choice(("positive", "negative", "neutral")) for i in range(len(reviews))]
+        positive, negative = TopicExtractor.extract_topics(reviews, sentiments, top_k=5)
+        # "positive" ছাড়া বাকি সব negative side এ
+        self.assertEqual(
+            [(t["topic"], t["count"]) for t in positive],
+            ref_top_topics([r for r, s in zip(reviews, sentiments) if s == "positive"], 5),
+        )
+        self.assertEqual(
+            [(t["topic"], t["count"]) for t in negative],
+            ref_top_topics([r for r, s in zip(reviews, sentiments) if s != "positive"], 5),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+utils.py text helpers vs the original regex/loop implementations.
+"""
+
+import random
+import re
+import unittest
+
+import utils
+from utils import STOP_WORDS
+
+
+# ============ REFERENCE (original implementations) ============
+
+def ref_clean_text(text):
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def ref_extract_words(text, remove_stopwords=True, min_length=3):
+    result = []
+    for word in ref_clean_text(text).split():
+        if len(word) < min_length:
+            continue
+        if remove_stopwords and word in STOP_WORDS:
+            continue
+        result.append(word)
+    return result
+
+
+def ref_is_valid_review(review, min_words=2):
+    if not review or not review.strip():
+        return False
+    return len(review.strip().split()) >= min_words
+
+
+def ref_batch_clean_reviews(reviews, min_words=2):
+    return [r.strip() for r in reviews if ref_is_valid_review(r, min_words)]
+
+
+# ASCII letters/punctuation, stop words, Unicode letters আর নানা whitespace মিশিয়ে random text
+_PIECES = (
+    list("abcXYZ019,.!'-_@#") + [" ", "  ", "\t", "\n", "\x0b", "\x1c", " ", " "]
+    + ["é", "ß", "İ", "ﬁ", "ü", "ক", "😀"]
+    + ["the", "battery", "Great", "product", "don't", "e-mail", "is", "and"]
+)
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 30))) for _ in range(n)]
+
+
+class CleanTextTests(unittest.TestCase):
+
+    def test_clean_text_matches_reference(self):
+        for text in random_texts(5000):
+            self.assertEqual(utils.clean_text(text), ref_clean_text(text), repr(text))
+            # lru_cache এর পেছনের uncached function ও একই
+            self.assertEqual(utils.clean_text.__wrapped__(text), ref_clean_text(text), repr(text))
+
+    def test_clean_words_is_split_clean_text(self):
+        for text in random_texts(2000, seed=1):
+            self.assertEqual(utils.clean_words(text), ref_clean_text(text).split(), repr(text))
+
+    def test_clean_text_ascii_words_match_reference(self):
+        # Spaces collapse হয় না, তাই split এর পর words মিলিয়ে দেখছি
+        for text in random_texts(2000, seed=2):
+            self.assertEqual(
+                utils.clean_text_ascii(text).split(),
+                [w.encode("ascii") for w in ref_clean_text(text).split()],
+                repr(text),
+            )
+
+
+class ExtractWordsTests(unittest.TestCase):
+
+    def test_extract_words_matches_reference(self):
+        texts = random_texts(3000, seed=3)
+        for remove_stopwords in (True, False):
+            for min_length in (0, 1, 3, 5):
+                for text in texts:
+                    self.assertEqual(
+                        utils.extract_words(text, remove_stopwords=remove_stopwords, min_length=min_length),
+                        ref_extract_words(text, remove_stopwords, min_length),
+                        (text, remove_stopwords, min_length),
+                    )
+
+    def test_default_arguments_path(self):
+        for text in random_texts(2000, seed=4):
+            self.assertEqual(utils.extract_words(text), ref_extract_words(text))
+
+
+class ReviewValidationTests(unittest.TestCase):
+
+    def test_is_valid_review_matches_reference(self):
+        texts = random_texts(3000, seed=5) + ["", "   ", "Good", "Great product!", " a  b "]
+        for min_words in (-1, 0, 1, 2, 3):
+            for text in texts:
+                self.assertEqual(
+                    utils.is_valid_review(text, min_words), ref_is_valid_review(text, min_words), (text, min_words)
+                )
+
+    def test_batch_clean_reviews_matches_reference(self):
+        texts = random_texts(3000, seed=6) + ["", "   ", "Good", "Great product!"]
+        for min_words in (1, 2, 3):
+            self.assertEqual(utils.batch_clean_reviews(texts, min_words), ref_batch_clean_reviews(texts, min_words))
+        self.assertEqual(utils.batch_clean_reviews(texts), ref_batch_clean_reviews(texts))
+
+
+if __name__ == "__main__":
+    unittest.main()
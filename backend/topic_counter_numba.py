@@ -0,0 +1,92 @@
+# ============ TOPIC COUNTER (NUMBA) ============
+# TopicExtractor এর tokenize + stop word filter + count loop এর JIT-compiled version
+# numba optional dependency - install না থাকলে NUMBA_AVAILABLE = False
+# তখন models.py bytes.split + Counter path ব্যবহার করবে
+
+from typing import FrozenSet
+
+import numpy as np
+
+try:
+    from numba import njit, types
+    from numba.typed import Dict
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# 64-bit FNV-1a constants
+FNV_OFFSET = 0xcbf29ce484222325
+FNV_PRIME = 0x100000001b3
+_MASK_64 = (1 << 64) - 1
+
+
+def fnv1a(word: str) -> int:
+    """
+    Kernel এর মতোই একই 64-bit FNV-1a hash (Python side, stop words এর জন্য)
+    """
+    h = FNV_OFFSET
+    for b in word.encode("ascii"):
+        h = ((h ^ b) * FNV_PRIME) & _MASK_64
+    return h
+
+
+def stop_word_hashes(words: FrozenSet[str]) -> np.ndarray:
+    """
+    Stop words এর sorted hash array - kernel এ binary search এর জন্য
+    """
+    return np.array(sorted(fnv1a(w) for w in words), dtype=np.uint64)
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, nogil=True)
+    def count_words(buf, stop_hashes, min_length):
+        """
+        clean_text করা ASCII buffer (শুধু a-z আর space) থেকে word count করে
+
+        Args:
+            buf: uint8 array - cleaned texts, space দিয়ে join করা
+            stop_hashes: sorted uint64 array - বাদ দেওয়ার words এর hash
+            min_length: এর চেয়ে ছোট word বাদ
+
+        Returns:
+            (counts, firsts, lengths) int64 arrays, প্রতিটা unique word এর জন্য একটা -
+            firsts = buf এ প্রথম occurrence এর offset, word টা buf[first:first + length]
+        """
+        # word hash -> slot (counts/firsts/lengths এর index)
+        slots = Dict.empty(key_type=types.uint64, value_type=types.int64)
+        counts = np.zeros(16, np.int64)
+        firsts = np.zeros(16, np.int64)
+        lengths = np.zeros(16, np.int64)
+        n_words = 0
+        n = buf.shape[0]
+        i = 0
+        while i < n:
+            if buf[i] == 32:
+                i += 1
+                continue
+            start = i
+            h = np.uint64(FNV_OFFSET)
+            while i < n and buf[i] != 32:
+                h = (h ^ np.uint64(buf[i])) * np.uint64(FNV_PRIME)
+                i += 1
+            if i - start < min_length:
+                continue
+            pos = np.searchsorted(stop_hashes, h)
+            if pos < stop_hashes.shape[0] and stop_hashes[pos] == h:
+                continue
+            if h in slots:
+                slot = slots[h]
+            else:
+                if n_words == counts.shape[0]:
+                    counts = np.concatenate((counts, np.zeros(n_words, np.int64)))
+                    firsts = np.concatenate((firsts, np.zeros(n_words, np.int64)))
+                    lengths = np.concatenate((lengths, np.zeros(n_words, np.int64)))
+                slot = n_words
+                slots[h] = slot
+                firsts[slot] = start
+                lengths[slot] = i - start
+                n_words += 1
+            counts[slot] += 1
+        return counts[:n_words], firsts[:n_words], lengths[:n_words]
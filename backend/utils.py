@@ -7,7 +7,10 @@
 import re
 
 # typing = type hints এর জন্য
-from typing import List, Set
+from typing import FrozenSet, List
+
+# Repeat text (duplicate reviews, একই text বারবার request এ) এর result cache
+from functools import lru_cache
 
 
 # ============ CONSTANTS ============
@@ -15,7 +18,8 @@ from typing import List, Set
 
 # Stop words = common words যেগুলো analysis এ কাজে আসে না
 # এগুলো বাদ দিলে important words খুঁজে পাওয়া সহজ হয়
-STOP_WORDS: Set[str] = {
+# frozenset: runtime এ কেউ বদলাতে পারবে না, lookup normal set এর মতোই O(1)
+STOP_WORDS: FrozenSet[str] = frozenset({
     # Articles & Conjunctions
     'the', 'a', 'an', 'and', 'or', 'but', 'if', 'then',
     
@@ -50,7 +54,36 @@ STOP_WORDS: Set[str] = {
     'great', 'good', 'bad', 'best', 'worst', 'product', 'item', 'thing',
     'buy', 'bought', 'purchase', 'purchased', 'recommend', 'recommended',
     'love', 'like', 'want', 'need', 'got', 'came', 'amazon'
-}
+})
+
+# clean_text এর regex - module load এর সময় একবারই compile হয়
+# [^a-z\s]+ মানে "a-z এবং whitespace ছাড়া সব" (একসাথে পরপর থাকলে এক match এ)
+_NON_LETTER_RE = re.compile(r'[^a-z\s]+')
+# Bound sub method - প্রতি call এ attribute lookup লাগে না
+_strip_non_letters = _NON_LETTER_RE.sub
+
+# ASCII text এর জন্য clean_text/clean_text_ascii এর byte tables (bytes.translate, C loop)
+# ASCII whitespace (str.split যেগুলোতে ভাগ করে, \x1c-\x1f সহ) → space, A-Z → a-z
+_ASCII_WHITESPACE = b'\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f '
+_ASCII_CLEAN_TABLE = bytes(
+    c + 32 if 65 <= c <= 90 else 32 if c in _ASCII_WHITESPACE else c
+    for c in range(256)
+)
+# Letter বা whitespace না হলে delete (clean_text এর regex এর মতো)
+_ASCII_CLEAN_DELETE = bytes(
+    c for c in range(256)
+    if not (65 <= c <= 90 or 97 <= c <= 122 or c in _ASCII_WHITESPACE)
+)
+
+
+# clean_text আর is_valid_review এর LRU cache size
+# ("Good product", empty string এর মতো duplicate review অনেক বেশি আসে)
+CLEAN_TEXT_CACHE_SIZE = 4096
+VALID_REVIEW_CACHE_SIZE = 1024
+
+# False করলে cache ছাড়া (cold) functions - benchmark/debug এর জন্য
+# Import এর সময় একবারই দেখা হয়, তাই utils import এর আগে বদলাতে হবে
+_ENABLE_CACHE = True
 
 
 # ============ TEXT CLEANING FUNCTIONS ============
@@ -70,22 +103,47 @@ def clean_text(text: str) -> str:
         # Returns: "hello world"
     """
     
-    # Step 1: Lowercase এ convert
-    # "GREAT Product" → "great product"
-    text = text.lower()
+    # Step 3: Words গুলো single space দিয়ে join - " hello    world " → "hello world"
+    return ' '.join(clean_words(text))
+
+
+def clean_words(text: str) -> List[str]:
+    """
+    clean_text(text).split() এর সমান, কিন্তু মাঝের joined string বানায় না
+    (clean_text আর extract_words দুজনেই এটা ব্যবহার করে)
     
-    # Step 2: শুধু letters (a-z) এবং spaces রাখছি
-    # [^a-z\s] মানে "a-z এবং whitespace ছাড়া সব"
-    # এগুলো empty string দিয়ে replace হবে (মানে delete)
-    text = re.sub(r'[^a-z\s]', '', text)
+    Example:
+        clean_words("Hello, World! 123")
+        # Returns: ["hello", "world"]
+    """
     
-    # Step 3: Multiple spaces কে single space করছি
-    # "hello    world" → "hello world"
-    text = re.sub(r'\s+', ' ', text)
+    # বেশিরভাগ review ASCII - তখন regex না, একটা bytes.translate এই
+    # lowercase (A-Z → a-z) + non-letter delete + whitespace → space হয়ে যায়
+    if text.isascii():
+        return text.encode('ascii').translate(_ASCII_CLEAN_TABLE, _ASCII_CLEAN_DELETE).decode('ascii').split()
     
-    # Step 4: শুরু ও শেষের extra spaces remove
-    # " hello world " → "hello world"
-    return text.strip()
+    # Non-ASCII: Unicode lowercase/whitespace rules লাগে, তাই regex path
+    # Step 1: Lowercase এ convert - "GREAT Product" → "great product"
+    # Step 2: শুধু letters (a-z) এবং spaces রাখছি - non-letters delete (একটাই regex pass)
+    # split() সব whitespace এ ভাগ করে আর empty অংশ ফেলে দেয় (দ্বিতীয় regex pass লাগে না)
+    return _strip_non_letters('', text.lower()).split()
+
+
+def clean_text_ascii(text: str) -> bytes:
+    """
+    clean_text এর bytes version - words একই, শুধু spaces collapse করা হয় না
+    (bytes.split() এর পর clean_text(text).split() এর সমান)
+
+    ASCII text (বেশিরভাগ review) এ একটা C-level translate call এই হয়ে যায়।
+    Non-ASCII হলে Unicode lowercase/whitespace rules লাগে, তখন clean_text ই ব্যবহার হয়।
+
+    Example:
+        clean_text_ascii("Hello, World! 123")
+        # Returns: b"hello world "
+    """
+    if text.isascii():
+        return text.encode('ascii').translate(_ASCII_CLEAN_TABLE, _ASCII_CLEAN_DELETE)
+    return clean_text(text).encode('ascii')
 
 
 def extract_words(text: str, remove_stopwords: bool = True, min_length: int = 3) -> List[str]:
@@ -105,26 +163,31 @@ def extract_words(text: str, remove_stopwords: bool = True, min_length: int = 3)
         # Returns: ["battery", "amazing"]
     """
     
-    # প্রথমে text clean করছি
-    cleaned = clean_text(text)
+    # Default arguments (সবচেয়ে common call) এর জন্য আলাদা specialized function
+    if remove_stopwords and min_length == 3:
+        return _extract_words_default(text)
     
-    # Words এ split করছি
-    words = cleaned.split()
+    # Text clean করে সরাসরি words - joined cleaned string আর re-split লাগে না
+    words = clean_words(text)
     
-    # Filter করছি
-    result = []
-    for word in words:
-        # Minimum length check
-        if len(word) < min_length:
-            continue
-            
-        # Stop words check (যদি remove করতে বলা হয়)
-        if remove_stopwords and word in STOP_WORDS:
-            continue
-            
-        result.append(word)
-    
-    return result
+    # Filter: আগে length check (সস্তা, বেশিরভাগ stop word ছোট), তারপর stop words
+    # List comprehension - loop এ বারবার result.append lookup/call লাগে না
+    if not remove_stopwords:
+        return [word for word in words if len(word) >= min_length]
+    return [word for word in words if len(word) >= min_length and word not in STOP_WORDS]
+
+
+def _extract_words_default(
+    text: str,
+    _clean_words=clean_words,
+    _stop_words: FrozenSet[str] = STOP_WORDS
+) -> List[str]:
+    """
+    extract_words(text, remove_stopwords=True, min_length=3) এর specialized version
+    Branch নেই, min_length constant, আর clean_words/STOP_WORDS default argument এ
+    bind করা - প্রতি word এ global lookup এর বদলে local/closure lookup হয়
+    """
+    return [word for word in _clean_words(text) if len(word) >= 3 and word not in _stop_words]
 
 
 def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
@@ -167,32 +230,44 @@ def is_valid_review(review: str, min_words: int = 2) -> bool:
         is_valid_review("Great product!")  # True (2 words)
     """
     
-    if not review or not review.strip():
+    if not review:
         return False
     
-    words = review.strip().split()
-    return len(words) >= min_words
+    # split() নিজেই শুরু/শেষের whitespace বাদ দেয়, তাই আলাদা strip() লাগে না
+    # maxsplit = min_words - 1: min_words টা word পাওয়ার পর আর ভাগ করে না,
+    # লম্বা review এর পুরো word list বানাতে হয় না
+    words = review.split(None, max(min_words - 1, 0))
+    return bool(words) and len(words) >= min_words
 
 
-def batch_clean_reviews(reviews: List[str]) -> List[str]:
+def batch_clean_reviews(reviews: List[str], min_words: int = 2) -> List[str]:
     """
     Multiple reviews একসাথে clean করে
-    Invalid reviews বাদ দেয়
+    Invalid reviews বাদ দেয় (is_valid_review এর মতো same rule)
     
     Args:
         reviews: List of raw reviews
+        min_words: Minimum কত words থাকতে হবে
         
     Returns:
         List of cleaned, valid reviews
     """
     
-    cleaned = []
-    for review in reviews:
-        # Valid কিনা check
-        if not is_valid_review(review):
-            continue
-        
-        # Strip করে add (extra spaces remove)
-        cleaned.append(review.strip())
-    
-    return cleaned
+    # filter(None) empty/None বাদ দেয়, map(str.strip) প্রতিটা review একবারই strip করে -
+    # দুটোই C তে চলে। Stripped string টাই word count check আর output দুটোতে ব্যবহার হয়
+    # (আগে is_valid_review দুইবার + এখানে আরেকবার strip হত)
+    # Strip এর পর খালি (শুধু whitespace ছিল) review সবসময় invalid
+    maxsplit = max(min_words - 1, 0)
+    return [
+        review
+        for review in map(str.strip, filter(None, reviews))
+        if review and len(review.split(None, maxsplit)) >= min_words
+    ]
+
+
+# ============ CACHING ============
+# দুটোই pure function, input str (hashable, immutable) - repeat text এ O(1) hit
+# Original (uncached) function টা clean_text.__wrapped__ এ থাকে
+if _ENABLE_CACHE:
+    clean_text = lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)(clean_text)
+    is_valid_review = lru_cache(maxsize=VALID_REVIEW_CACHE_SIZE)(is_valid_review)